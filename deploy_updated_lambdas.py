@@ -14,6 +14,9 @@ import zipfile
 import io
 import os
 import json
+import subprocess
+import sys
+import tempfile
 import time
 
 # AWS Configuration
@@ -21,32 +24,42 @@ REGION = 'us-east-1'
 ACCOUNT_ID = '120569639479'
 LAMBDA_ROLE_ARN = 'arn:aws:iam::120569639479:role/CFDOptimizationAgentStack-LambdaExecutionRoleC61CE2F-l2R78aFnANAv'
 
+# Third-party packages for the shared modules (orjson for json_codec.py)
+SHARED_REQUIREMENTS = 'lambdas/shared/requirements.txt'
+
 # Lambda function mappings with shared dependencies
-# Format: folder_name -> {'name': aws_function_name, 'shared': [list of shared files]}
+# Format: folder_name -> {'name': aws_function_name, 'shared': [list of shared files],
+#                         'requirements': pip requirements file to bundle (optional)}
 LAMBDA_FUNCTIONS = {
     'generate_geometry': {
         'name': 'cfd-generate-geometry',
-        'shared': ['storage_s3.py', 'session_manager.py']
+        'shared': ['json_codec.py', 'agent_response.py'],
+        'requirements': SHARED_REQUIREMENTS
     },
     'run_cfd': {
         'name': 'cfd-run-cfd',
-        'shared': ['storage_s3.py', 'session_manager.py']
+        'shared': ['json_codec.py'],  # Writes to S3 with its own boto3 client
+        'requirements': SHARED_REQUIREMENTS
     },
     'get_next_candidates': {
         'name': 'cfd-get-next-candidates',
-        'shared': ['storage_s3.py', 'session_manager.py']
+        'shared': ['json_codec.py', 'agent_response.py', 'storage_s3.py', 'session_manager.py'],
+        'requirements': SHARED_REQUIREMENTS
     },
     'initialize_optimization': {
         'name': 'cfd-initialize-optimization',
-        'shared': ['storage_s3.py', 'session_manager.py']
+        'shared': ['json_codec.py', 'session_manager.py'],
+        'requirements': SHARED_REQUIREMENTS
     },
     'check_convergence': {
         'name': 'cfd-check-convergence',
-        'shared': ['storage_s3.py', 'session_manager.py']
+        'shared': ['json_codec.py', 'storage_s3.py'],
+        'requirements': SHARED_REQUIREMENTS
     },
     'generate_report': {
         'name': 'cfd-generate-report',
-        'shared': ['storage_s3.py', 'session_manager.py']
+        'shared': ['json_codec.py', 'storage_s3.py', 'session_manager.py'],
+        'requirements': SHARED_REQUIREMENTS
     },
     'invoke_bedrock_agent': {
         'name': 'cfd-invoke-bedrock-agent',
@@ -57,13 +70,40 @@ LAMBDA_FUNCTIONS = {
 lambda_client = boto3.client('lambda', region_name=REGION)
 
 
-def create_deployment_package(function_folder, shared_files=None):
+def add_requirements(zip_file, requirements_file):
+    """
+    pip-install a requirements file for the Lambda runtime and add it to the ZIP.
+
+    Wheels are selected for python3.12 on x86_64 Linux regardless of the
+    machine running the deployment.
+
+    Args:
+        zip_file: Open zipfile.ZipFile to add the packages to
+        requirements_file: Path to a pip requirements file
+    """
+    with tempfile.TemporaryDirectory() as target:
+        subprocess.run(
+            [sys.executable, '-m', 'pip', 'install', '--quiet', '--no-compile',
+             '--requirement', requirements_file, '--target', target,
+             '--platform', 'manylinux2014_x86_64', '--implementation', 'cp',
+             '--python-version', '3.12', '--only-binary=:all:'],
+            check=True
+        )
+        for root, _, files in os.walk(target):
+            for name in files:
+                path = os.path.join(root, name)
+                zip_file.write(path, os.path.relpath(path, target))
+    print(f"  ✓ Added packages from {requirements_file}")
+
+
+def create_deployment_package(function_folder, shared_files=None, requirements_file=None):
     """
     Create a ZIP file containing the Lambda function code and dependencies.
 
     Args:
         function_folder: Name of the Lambda function folder
         shared_files: List of shared files to include (optional)
+        requirements_file: pip requirements file to bundle (optional)
 
     Returns:
         bytes: ZIP file content
@@ -99,6 +139,9 @@ def create_deployment_package(function_folder, shared_files=None):
                 else:
                     print(f"  ⚠ Warning: {shared_file} not found in either location (skipping)")
 
+        if requirements_file:
+            add_requirements(zip_file, requirements_file)
+
     zip_buffer.seek(0)
     return zip_buffer.read()
 
@@ -228,17 +271,19 @@ def main():
         if isinstance(config, dict):
             function_name = config['name']
             shared_files = config.get('shared', [])
+            requirements_file = config.get('requirements')
         else:
             # Backward compatibility: if config is just a string
             function_name = config
             shared_files = []
+            requirements_file = None
 
         print(f"\n{folder_name} → {function_name}")
         print("-" * 60)
 
         # Create deployment package
         print("Creating deployment package...")
-        zip_content = create_deployment_package(folder_name, shared_files)
+        zip_content = create_deployment_package(folder_name, shared_files, requirements_file)
 
         if zip_content is None:
             print(f"  ✗ Skipping {function_name} (missing files)")
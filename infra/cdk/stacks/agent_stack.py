@@ -12,6 +12,8 @@ from aws_cdk import (
 )
 from constructs import Construct
 import json
+
+from .shared_layer import create_shared_layer
 from typing import TYPE_CHECKING, Optional
 if TYPE_CHECKING:
     from .storage_stack import StorageStack
@@ -50,6 +52,13 @@ class AgentStack(Stack):
         # LAMBDA FUNCTIONS
         # ==========================================
 
+        # Shared modules (json_codec, agent_response, storage) and orjson for the
+        # tool functions
+        shared_layer = create_shared_layer(
+            self, "ToolSharedModulesLayer",
+            layer_version_name="cfd-agent-shared-modules"
+        )
+
         # Common Lambda configuration
         lambda_config = {
             "runtime": lambda_.Runtime.PYTHON_3_12,
@@ -57,6 +66,7 @@ class AgentStack(Stack):
             "memory_size": 512,
             "role": lambda_role,
             "log_retention": logs.RetentionDays.ONE_WEEK,
+            "layers": [shared_layer],
         }
 
         # Lambda 1: Generate Geometry
@@ -81,6 +91,7 @@ class AgentStack(Stack):
             memory_size=512,
             role=lambda_role,
             log_retention=logs.RetentionDays.ONE_WEEK,
+            layers=[shared_layer],
         )
 
         # Lambda 3: Get Next Candidates
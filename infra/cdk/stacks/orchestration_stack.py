@@ -3,7 +3,7 @@
 Orchestration Stack: Lambda functions for Step Functions workflow with shared layer
 
 Creates:
-- Lambda Layer with shared S3 modules (session_manager, s3_storage)
+- Lambda Layer with shared modules (session_manager, storage_s3, json_codec) and orjson
 - 4 orchestration Lambda functions with the layer attached
 """
 
@@ -18,6 +18,8 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+from .shared_layer import create_shared_layer
+
 
 class OrchestrationStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, storage_stack, **kwargs) -> None:
@@ -31,11 +33,8 @@ class OrchestrationStack(Stack):
         # ==========================================
         print("Creating Lambda Layer for shared modules...")
 
-        shared_layer = lambda_.LayerVersion(
+        shared_layer = create_shared_layer(
             self, "SharedModulesLayer",
-            code=lambda_.Code.from_asset("../../lambdas/shared"),
-            compatible_runtimes=[lambda_.Runtime.PYTHON_3_12],
-            description="Shared S3 storage and session management modules",
             layer_version_name="cfd-optimization-shared-modules"
         )
 
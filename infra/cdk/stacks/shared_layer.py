@@ -0,0 +1,39 @@
+# infra/cdk/stacks/shared_layer.py
+"""
+Lambda Layer with the shared modules in lambdas/shared/python and their
+third-party requirements (lambdas/shared/requirements.txt, e.g. orjson).
+"""
+
+from aws_cdk import (
+    BundlingOptions,
+    aws_lambda as lambda_,
+)
+from constructs import Construct
+
+SHARED_DIR = "../../lambdas/shared"
+
+
+def create_shared_layer(scope: Construct, construct_id: str, layer_version_name: str) -> lambda_.LayerVersion:
+    """
+    Build the shared modules layer.
+
+    Requirements are pip-installed into python/ inside the Lambda build image
+    so compiled wheels match the runtime.
+    """
+    return lambda_.LayerVersion(
+        scope, construct_id,
+        code=lambda_.Code.from_asset(
+            SHARED_DIR,
+            bundling=BundlingOptions(
+                image=lambda_.Runtime.PYTHON_3_12.bundling_image,
+                command=[
+                    "bash", "-c",
+                    "pip install --no-cache-dir -r requirements.txt -t /asset-output/python"
+                    " && cp -r python /asset-output/"
+                ]
+            )
+        ),
+        compatible_runtimes=[lambda_.Runtime.PYTHON_3_12],
+        description="Shared S3 storage, session management and JSON modules",
+        layer_version_name=layer_version_name
+    )
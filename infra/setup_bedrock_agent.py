@@ -6,6 +6,16 @@ import boto3
 import json
 import time
 from pathlib import Path
+from botocore.config import Config
+
+STACK_NAME = 'CFDOptimizationAgentStack'
+
+# Fail fast on hangs and back off adaptively when CloudFormation throttles
+_CFN_CLIENT = boto3.client(
+    'cloudformation',
+    region_name='us-east-1',
+    config=Config(retries={'mode': 'adaptive'}, read_timeout=5)
+)
 
 
 def read_system_prompt():
@@ -23,17 +33,13 @@ def read_tool_schema():
 
 
 def get_cdk_outputs():
-    """
-    Get Lambda ARNs from CDK stack outputs.
-    """
-    cfn = boto3.client('cloudformation', region_name='us-east-1')
-
+    """Get Lambda ARNs from CDK stack outputs."""
     try:
-        response = cfn.describe_stacks(StackName='CFDOptimizationAgentStack')
-        outputs = response['Stacks'][0]['Outputs']
+        response = _CFN_CLIENT.describe_stacks(StackName=STACK_NAME)
+        stack = response['Stacks'][0]
 
         result = {}
-        for output in outputs:
+        for output in stack.get('Outputs', []):
             key = output['OutputKey']
             value = output['OutputValue']
             result[key] = value
@@ -1,14 +1,19 @@
 """
-Check Convergence - Read from S3 and determine if optimization should continue
+Check Convergence - Read iteration results and determine if optimization should continue
 
 Purpose: Analyze optimization progress and decide whether to continue or stop
-- Read design history and iteration results from S3
+- Read iteration results from S3 (default) or a local results.csv
 - Calculate improvement percentage
 - Check convergence criteria
 - Return decision with reasoning
+
+The backend is selected with the CONVERGENCE_BACKEND environment variable
+('s3' or 'csv'); only the selected backend's modules are imported.
 """
 
+import functools
 import json
+import os
 from datetime import datetime
 import logging
 
@@ -16,14 +21,158 @@ import logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Import S3 storage modules
-try:
-    from storage_s3 import S3DesignHistoryStorage, S3ResultsStorage
-    from session_manager import SessionManager
-    S3_ENABLED = True
-except ImportError:
-    logger.warning("S3 storage modules not available")
-    S3_ENABLED = False
+CONVERGENCE_BACKEND = os.environ.get('CONVERGENCE_BACKEND', 's3').lower()
+RESULTS_CSV_PATH = os.environ.get('RESULTS_CSV_PATH', '/tmp/data/results.csv')
+
+# Every response path emits the same key set so Step Functions choice states
+# never hit a missing field
+_RESPONSE_TEMPLATE = {
+    'converged': False,
+    'iteration': 0,
+    'reason': '',
+    'best_cd': None,
+    'best_geometry_id': None,
+    'improvement_pct': None,
+    'timestamp': None
+}
+
+
+def _build_response(timestamp, **fields):
+    """Copy the response template and fill in the per-path fields."""
+    response = _RESPONSE_TEMPLATE.copy()
+    response['timestamp'] = timestamp
+    response.update(fields)
+    return response
+
+
+@functools.cache
+def _get_s3_impl():
+    """Import the S3 results storage factory on first use; None if unavailable."""
+    try:
+        from storage_s3 import get_results_storage
+        return get_results_storage
+    except ImportError:
+        logger.warning("S3 storage modules not available")
+        return None
+
+
+# Inside Lambda with the S3 backend, build the (cached) S3 client during INIT
+# so the first convergence check doesn't pay for it
+if (CONVERGENCE_BACKEND != 'csv' and os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
+        and _get_s3_impl() is not None):
+    from storage_s3 import get_s3_client
+    get_s3_client()
+
+
+def _read_results_s3(session_id):
+    """
+    Read iteration results for a session from S3.
+
+    Returns:
+        tuple: (iteration count, list with the last two results)
+    """
+    results = _get_s3_impl()(session_id).read_all_results()
+    return len(results), results[-2:]
+
+
+# State of the last results.csv read, kept across warm invocations. The file
+# is only ever appended to, so a later read parses just the bytes added since
+# 'size'; only the row count and the last two rows are retained.
+_TAIL_CACHE = {
+    'path': None,
+    'mtime': 0.0,
+    'size': 0,
+    'header': None,
+    'count': 0,
+    'rows': []
+}
+
+
+def _reset_tail_cache(path):
+    """Forget the cached state and start reading path from the beginning."""
+    _TAIL_CACHE.update(path=path, mtime=0.0, size=0, header=None, count=0, rows=[])
+
+
+def _read_results_csv(path):
+    """
+    Read iteration results from a local results.csv.
+
+    The file is stat'ed first: if its mtime and size match the cached read,
+    nothing is opened. Otherwise only the bytes appended since the cached
+    size are parsed. A file that shrank or was rewritten in place is read
+    again from the start.
+
+    Returns:
+        tuple: (iteration count, list with the last two results)
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _reset_tail_cache(None)
+        return 0, []
+
+    cache = _TAIL_CACHE
+    unchanged = (cache['path'] == path and stat.st_mtime == cache['mtime']
+                 and stat.st_size == cache['size'])
+
+    if not unchanged:
+        if cache['path'] != path or stat.st_size <= cache['size']:
+            _reset_tail_cache(path)
+        _read_appended_rows(path, stat)
+
+    last_two = []
+    for row in cache['rows']:
+        row = dict(row)
+        try:
+            row['best_cd'] = float(row['best_cd'])
+        except (KeyError, TypeError, ValueError):
+            row['best_cd'] = None
+        last_two.append(row)
+
+    return cache['count'], last_two
+
+
+def _read_appended_rows(path, stat):
+    """Parse the rows appended to path since the cached size into _TAIL_CACHE."""
+    import csv
+    import io
+    from collections import deque
+
+    cache = _TAIL_CACHE
+    with open(path, 'rb') as f:
+        f.seek(cache['size'])
+        appended = f.read(stat.st_size - cache['size'])
+
+    # Only complete lines are parsed; a row still being written is picked up
+    # by the next read
+    complete = appended.rfind(b'\n') + 1
+    text = appended[:complete].decode('utf-8')
+
+    rows = deque(cache['rows'], maxlen=2)
+    for values in csv.reader(io.StringIO(text, newline='')):
+        if not values:
+            continue
+        if cache['header'] is None:
+            cache['header'] = values
+            continue
+        cache['count'] += 1
+        rows.append(dict(zip(cache['header'], values)))
+    cache['rows'] = list(rows)
+
+    cache['size'] += complete
+    cache['mtime'] = stat.st_mtime
+
+
+def _compute_improvement(cd_prev, cd_current):
+    """
+    Percentage improvement from cd_prev to cd_current.
+
+    Returns:
+        float rounded to 2 decimals, or None if either value is missing/zero
+    """
+    if cd_prev is None or cd_current is None or cd_prev == 0:
+        return None
+    return round((cd_prev - cd_current) / cd_prev * 100, 2)
 
 
 def lambda_handler(event, context):
@@ -44,111 +193,117 @@ def lambda_handler(event, context):
             'reason': 'Still improving',
             'iteration': 1,
             'best_cd': 0.0142,
-            'improvement_pct': 2.8
+            'best_geometry_id': 'NACA4412_a2.0',
+            'improvement_pct': 2.8,
+            'timestamp': '2025-10-07T14:30:22.123456'
         }
     """
 
+    now = datetime.now().isoformat()
+
     try:
         logger.info("Checking convergence...")
-        logger.info(f"Input event: {json.dumps(event)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Input event: %s", json.dumps(event))
 
         session_id = event.get('sessionId')
         max_iter = int(event.get('max_iter', 8))
         cl_min = float(event.get('cl_min', 0.30))
         current_iteration = int(event.get('iteration', 0))
 
-        # === READ FROM S3 ===
-        if not S3_ENABLED or not session_id:
+        # === READ RESULTS FROM THE ACTIVE BACKEND ===
+        if CONVERGENCE_BACKEND != 'csv' and (not session_id or _get_s3_impl() is None):
             logger.warning("S3 not enabled or no session_id")
-            return {
-                'converged': False,
-                'reason': 'S3 storage not available',
-                'iteration': current_iteration
-            }
+            return _build_response(
+                now,
+                reason='S3 storage not available',
+                iteration=current_iteration
+            )
 
         try:
-            # Read results from S3
-            results_storage = S3ResultsStorage(session_id)
-            results = results_storage.read_all_results()
+            if CONVERGENCE_BACKEND == 'csv':
+                iteration_number, last_two = _read_results_csv(RESULTS_CSV_PATH)
+            else:
+                iteration_number, last_two = _read_results_s3(session_id)
 
-            logger.info(f"Read {len(results)} iteration results from S3")
+            logger.info(f"Read {iteration_number} iteration results ({CONVERGENCE_BACKEND})")
 
             # If no results yet, not converged
-            if len(results) == 0:
+            if iteration_number == 0:
                 logger.info("No results yet - continuing")
-                return {
-                    'converged': False,
-                    'reason': 'No iterations completed yet',
-                    'iteration': 0,
-                    'best_cd': None,
-                    'improvement_pct': None # Add this line
-                }
+                return _build_response(now, reason='No iterations completed yet')
 
             # Get latest iteration data
-            latest = results[-1]
-            iteration_number = len(results)
+            latest = last_two[-1]
             best_cd = latest.get('best_cd')
+            best_geometry_id = latest.get('best_geometry_id')
 
             # Check max iterations
             if iteration_number >= max_iter:
                 logger.info(f"Max iterations reached: {iteration_number} >= {max_iter}")
-                return {
-                    'converged': True,
-                    'reason': f'Maximum iterations reached ({max_iter})',
-                    'iteration': iteration_number,
-                    'best_cd': best_cd,
-                    'improvement_pct': improvement_pct
-                }
+                return _build_response(
+                    now,
+                    converged=True,
+                    reason=f'Maximum iterations reached ({max_iter})',
+                    iteration=iteration_number,
+                    best_cd=best_cd,
+                    best_geometry_id=best_geometry_id
+                )
 
             # Check improvement if we have at least 2 iterations
-            if len(results) >= 2:
-                improvement_pct = results_storage.calculate_improvement()
+            if len(last_two) >= 2:
+                improvement_pct = _compute_improvement(
+                    last_two[0].get('best_cd'), last_two[1].get('best_cd')
+                )
 
                 logger.info(f"Improvement: {improvement_pct}%")
 
                 # Converged if improvement is small
                 if improvement_pct is not None and improvement_pct < 0.5:
                     logger.info("Converged: improvement < 0.5%")
-                    return {
-                        'converged': True,
-                        'reason': f'Improvement below threshold ({improvement_pct:.2f}% < 0.5%)',
-                        'iteration': iteration_number,
-                        'best_cd': best_cd,
-                        'improvement_pct': improvement_pct
-                    }
+                    return _build_response(
+                        now,
+                        converged=True,
+                        reason=f'Improvement below threshold ({improvement_pct:.2f}% < 0.5%)',
+                        iteration=iteration_number,
+                        best_cd=best_cd,
+                        best_geometry_id=best_geometry_id,
+                        improvement_pct=improvement_pct
+                    )
 
                 # Still improving - continue
-                return {
-                    'converged': False,
-                    'reason': f'Still improving ({improvement_pct:.2f}%)',
-                    'iteration': iteration_number,
-                    'best_cd': best_cd,
-                    'improvement_pct': improvement_pct
-                }
+                return _build_response(
+                    now,
+                    reason=f'Still improving ({improvement_pct:.2f}%)' if improvement_pct is not None
+                    else 'Improvement not available',
+                    iteration=iteration_number,
+                    best_cd=best_cd,
+                    best_geometry_id=best_geometry_id,
+                    improvement_pct=improvement_pct
+                )
 
             # Only 1 iteration - definitely continue
-            return {
-                'converged': False,
-                'reason': 'Only one iteration completed',
-                'iteration': iteration_number,
-                'best_cd': best_cd,
-                'improvement_pct': improvement_pct
-            }
-
-        except Exception as s3_error:
-            logger.error(f"Error reading from S3: {s3_error}", exc_info=True)
-            return {
-                'converged': False,
-                'reason': f'S3 error: {str(s3_error)}',
-                'iteration': current_iteration,
-                'error': str(s3_error)
-            }
+            return _build_response(
+                now,
+                reason='Only one iteration completed',
+                iteration=iteration_number,
+                best_cd=best_cd,
+                best_geometry_id=best_geometry_id
+            )
+
+        except Exception as read_error:
+            logger.error(f"Error reading results: {read_error}", exc_info=True)
+            return _build_response(
+                now,
+                reason=f'{CONVERGENCE_BACKEND.upper()} error: {str(read_error)}',
+                iteration=current_iteration,
+                error=str(read_error)
+            )
 
     except Exception as e:
         logger.error(f"Error checking convergence: {str(e)}", exc_info=True)
-        return {
-            'converged': False,
-            'reason': f'Error: {str(e)}',
-            'iteration': 0,
-            'error': str(e)
-        }
\ No newline at end of file
+        return _build_response(
+            now,
+            reason=f'Error: {str(e)}',
+            error=str(e)
+        )
@@ -2,19 +2,82 @@
 Lambda function: generate_geometry
 Handles Bedrock Agent format for generating airfoil geometry
 """
-import json
+import functools
 import logging
+import os
+import time
+
+from agent_response import create_error_response, create_success_response
 
 # Set up logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Full tracebacks are logged at most once per interval so a failing
+# dependency doesn't flood CloudWatch; other failures log a single line
+_TRACEBACK_INTERVAL = 1.0
+_last_traceback_at = float('-inf')
+
+
+def _recent_error():
+    """Return True if a traceback was already logged within the interval."""
+    global _last_traceback_at
+    now = time.monotonic()
+    if now - _last_traceback_at < _TRACEBACK_INTERVAL:
+        return True
+    _last_traceback_at = now
+    return False
+
+
+# Valid NACA parameter ranges: (label, low, high, range text for warnings),
+# in the order (thickness, max_camber, camber_position, alpha)
+_PARAM_BOUNDS = (
+    ("Thickness", 0.08, 0.20, "[0.08, 0.20]"),
+    ("Max camber", 0.0, 0.08, "[0.0, 0.08]"),
+    ("Camber position", 0.2, 0.6, "[0.2, 0.6]"),
+    ("Angle of attack", -2, 10, "[-2, 10]"),
+)
+
+
+def validate_naca_parameters(thickness, max_camber, camber_position, alpha):
+    """
+    Check NACA parameters against their valid ranges.
+
+    Returns:
+        tuple: (valid, list of warning strings for out-of-range values)
+    """
+    values = (thickness, max_camber, camber_position, alpha)
+    warnings = [
+        f"{label} {value} outside valid range {range_text}"
+        for (label, low, high, range_text), value in zip(_PARAM_BOUNDS, values)
+        if not low <= value <= high
+    ]
+    return not warnings, warnings
+
+
+# Lambda runs one invocation at a time per container, so these caches are
+# never mutated concurrently. typed=True because 2 and 2.0 hash alike but
+# format differently (_a2 vs _a2.0).
+@functools.lru_cache(maxsize=1024, typed=True)
+def _naca_code(max_camber, camber_position, thickness):
+    """Build the NACA 4-digit code, e.g. NACA4412."""
+    m_digit = int(max_camber * 100)
+    p_digit = int(camber_position * 10)
+    t_digits = int(thickness * 100)
+    return f"NACA{m_digit}{p_digit}{t_digits:02d}"
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def generate_geometry_id(thickness, max_camber, camber_position, alpha):
+    """Build the geometry ID (NACA code plus angle of attack), e.g. NACA4412_a2.0."""
+    return f"{_naca_code(max_camber, camber_position, thickness)}_a{alpha}"
 
 
 def lambda_handler(event, context):
     """Generate and validate airfoil geometry - Bedrock Agent compatible."""
 
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        logger.debug("Received event: %s", event)
 
         # Extract parameters from Bedrock Agent format
         params = {}
@@ -22,10 +85,13 @@ def lambda_handler(event, context):
             content = event['requestBody']['content']
             if 'application/json' in content:
                 properties = content['application/json'].get('properties', [])
-                for prop in properties:
-                    params[prop['name']] = float(prop['value'])
+                params = {
+                    prop['name']: float(prop['value'])
+                    for prop in properties
+                    if prop.get('value') is not None
+                }
 
-        logger.info(f"Extracted parameters: {params}")
+        logger.info("Extracted parameters: %s", params)
 
         # Get NACA parameters
         thickness = params.get('thickness', 0.12)
@@ -34,33 +100,11 @@ def lambda_handler(event, context):
         alpha = params.get('alpha', 2.0)
 
         # Validate parameters
-        valid = True
-        warnings = []
-
-        if not (0.08 <= thickness <= 0.20):
-            valid = False
-            warnings.append(f"Thickness {thickness} outside valid range [0.08, 0.20]")
-
-        if not (0.0 <= max_camber <= 0.08):
-            valid = False
-            warnings.append(f"Max camber {max_camber} outside valid range [0.0, 0.08]")
-
-        if not (0.2 <= camber_position <= 0.6):
-            valid = False
-            warnings.append(f"Camber position {camber_position} outside valid range [0.2, 0.6]")
-
-        if not (-2 <= alpha <= 10):
-            valid = False
-            warnings.append(f"Angle of attack {alpha} outside valid range [-2, 10]")
+        valid, warnings = validate_naca_parameters(thickness, max_camber, camber_position, alpha)
 
-        # Generate NACA code
-        m_digit = int(max_camber * 100)
-        p_digit = int(camber_position * 10)
-        t_digits = int(thickness * 100)
-        naca_code = f"NACA{m_digit}{p_digit}{t_digits:02d}"
-
-        # Create geometry ID with angle of attack
-        geometry_id = f"{naca_code}_a{alpha}"
+        # Generate NACA code and geometry ID with angle of attack
+        naca_code = _naca_code(max_camber, camber_position, thickness)
+        geometry_id = generate_geometry_id(thickness, max_camber, camber_position, alpha)
 
         result = {
             "geometry_id": geometry_id,
@@ -77,39 +121,17 @@ def lambda_handler(event, context):
         if warnings:
             result["warnings"] = warnings
 
-        logger.info(f"Generated geometry: {json.dumps(result)}")
+        logger.info("Generated geometry: %s", geometry_id)
+        logger.debug("Geometry result: %s", result)
 
         # Return in Bedrock Agent format
-        return {
-            "messageVersion": "1.0",
-            "response": {
-                "actionGroup": event.get('actionGroup', ''),
-                "apiPath": event.get('apiPath', ''),
-                "httpMethod": event.get('httpMethod', ''),
-                "httpStatusCode": 200,
-                "responseBody": {
-                    "application/json": {
-                        "body": json.dumps(result)
-                    }
-                }
-            }
-        }
+        return create_success_response(event, result)
 
     except Exception as e:
-        logger.error(f"ERROR in lambda_handler: {str(e)}", exc_info=True)
+        if _recent_error():
+            logger.error("ERROR in lambda_handler: %s", e)
+        else:
+            logger.exception("ERROR in lambda_handler: %s", e)
 
         # Return error in Bedrock Agent format
-        return {
-            "messageVersion": "1.0",
-            "response": {
-                "actionGroup": event.get('actionGroup', ''),
-                "apiPath": event.get('apiPath', ''),
-                "httpMethod": event.get('httpMethod', ''),
-                "httpStatusCode": 500,
-                "responseBody": {
-                    "application/json": {
-                        "body": json.dumps({"error": str(e)})
-                    }
-                }
-            }
-        }
\ No newline at end of file
+        return create_error_response(event, str(e))
@@ -9,24 +9,91 @@ Purpose: Create comprehensive summary of optimization results
 """
 
 import json
-from datetime import datetime
 import logging
 import os
+import time
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Bucket shown in logs and reports
+S3_BUCKET = os.environ.get('S3_BUCKET', 'cfd-optimization-data-120569639479')
+
 # Import S3 storage modules
 try:
-    from storage_s3 import S3DesignHistoryStorage, S3ResultsStorage, get_optimization_summary
-    from session_manager import SessionManager
+    from storage_s3 import (
+        get_design_storage, get_results_storage, find_best_design, get_s3_client
+    )
 
     S3_ENABLED = True
 except ImportError:
     logger.warning("S3 storage modules not available")
     S3_ENABLED = False
 
+# Build the (cached) S3 client during INIT, which runs at full CPU and isn't
+# billed as handler time, instead of on the first report
+if S3_ENABLED and os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    get_s3_client()
+
+
+def _utc_timestamp():
+    """Current UTC time as ISO 8601 to the second, without a datetime object."""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+
+
+# Numeric best-design fields and the decimals they are reported with. Design
+# JSON stores these as numbers, so they are rounded without a float() cast.
+_BEST_DESIGN_FIELDS = (
+    ('Cd', 5),
+    ('Cl', 4),
+    ('L_D', 2),
+    ('thickness', 4),
+    ('max_camber', 4),
+    ('camber_position', 4),
+    ('alpha', 2),
+)
+
+# Text report layout; filled with str.format_map in lambda_handler
+_SEP = '=' * 60
+_REPORT_TEMPLATE = """
+{sep}
+CFD OPTIMIZATION REPORT
+{sep}
+
+SESSION: {session_id}
+STATUS: {status}
+Reason: {convergence_reason}
+
+ITERATIONS: {total_iterations}
+Designs Evaluated: {designs_evaluated}
+
+BEST DESIGN: {geometry_id}
+  Cd (drag):         {Cd:.5f}
+  Cl (lift):         {Cl:.4f}
+  L/D ratio:         {L_D:.2f}
+
+  Thickness:         {thickness:.4f}
+  Max Camber:        {max_camber:.4f}
+  Camber Position:   {camber_position:.4f}
+  Alpha (degrees):   {alpha:.2f}
+
+PERFORMANCE:
+  Initial Cd:        {initial_cd}
+  Final Cd:          {final_cd}
+  Improvement:       {improvement_pct:.2f}%
+
+  Constraint (Cl >= {constraint_cl_min}):
+    {constraint_status}
+    Achieved Cl: {achieved_cl:.4f}
+
+S3 LOCATION:
+  Bucket: {bucket}
+  Path: sessions/{session_id}/
+
+{sep}
+"""
+
 
 def lambda_handler(event, context):
     """
@@ -53,7 +120,8 @@ def lambda_handler(event, context):
 
     try:
         logger.info("Generating optimization report from S3...")
-        logger.info(f"Input event: {json.dumps(event)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Input event: %s", json.dumps(event))
 
         session_id = event.get('sessionId')
         cl_min = float(event.get('cl_min', 0.30))
@@ -72,15 +140,16 @@ def lambda_handler(event, context):
 
         try:
             # Get comprehensive optimization summary from S3
-            design_storage = S3DesignHistoryStorage(session_id)
-            results_storage = S3ResultsStorage(session_id)
+            design_storage = get_design_storage(session_id)
+            results_storage = get_results_storage(session_id)
 
             designs = design_storage.read_all_designs()
-            results = results_storage.read_all_results()
+            # Only the first and last iteration summaries are needed
+            total_iterations, first_result, last_result = results_storage.read_first_and_last_results()
 
-            logger.info(f"Read {len(designs)} designs and {len(results)} iterations from S3")
+            logger.info(f"Read {len(designs)} designs and {total_iterations} iterations from S3")
 
-            if len(results) == 0:
+            if total_iterations == 0:
                 logger.warning("No results to report")
                 return {
                     'statusCode': 200,
@@ -90,28 +159,27 @@ def lambda_handler(event, context):
                     }
                 }
 
-            # Get best design
-            best_design_data = design_storage.get_best_design(constraint_cl_min=cl_min)
+            # Get best design from the designs already in memory
+            best_design_data = find_best_design(designs, constraint_cl_min=cl_min)
 
             if best_design_data is None:
                 logger.error("Could not find best design")
                 best_design_data = designs[-1] if designs else {}
 
             # Calculate statistics
-            total_iterations = len(results)
             total_designs_evaluated = len(designs)
 
             # Get improvement from first to last iteration
-            if len(results) > 1:
-                initial_cd = results[0].get('best_cd')
-                final_cd = results[-1].get('best_cd')
+            if total_iterations > 1:
+                initial_cd = first_result.get('best_cd')
+                final_cd = last_result.get('best_cd')
 
                 if initial_cd and final_cd:
                     total_improvement = ((initial_cd - final_cd) / initial_cd) * 100
                 else:
                     total_improvement = 0.0
             else:
-                final_cd = results[0].get('best_cd')
+                final_cd = first_result.get('best_cd')
                 initial_cd = final_cd
                 total_improvement = 0.0
 
@@ -127,17 +195,14 @@ def lambda_handler(event, context):
                     'total_iterations': int(total_iterations),
                     'designs_evaluated': int(total_designs_evaluated),
                     'convergence_reason': convergence_reason,
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': _utc_timestamp()
                 },
                 'best_design': {
                     'geometry_id': str(best_design_data.get('geometry_id', 'N/A')),
-                    'Cd': round(float(best_design_data.get('Cd', 0)), 5),
-                    'Cl': round(float(best_design_data.get('Cl', 0)), 4),
-                    'L_D': round(float(best_design_data.get('L_D', 0)), 2),
-                    'thickness': round(float(best_design_data.get('thickness', 0)), 4),
-                    'max_camber': round(float(best_design_data.get('max_camber', 0)), 4),
-                    'camber_position': round(float(best_design_data.get('camber_position', 0)), 4),
-                    'alpha': round(float(best_design_data.get('alpha', 0)), 2)
+                    **{
+                        field: round(best_design_data.get(field, 0), digits)
+                        for field, digits in _BEST_DESIGN_FIELDS
+                    }
                 },
                 'performance': {
                     'initial_cd': round(initial_cd, 5) if initial_cd else None,
@@ -150,51 +215,48 @@ def lambda_handler(event, context):
             }
 
             # Create formatted text report
-            report_text = f"""
-{'=' * 60}
-CFD OPTIMIZATION REPORT
-{'=' * 60}
-
-SESSION: {session_id}
-STATUS: {report['optimization_summary']['status']}
-Reason: {report['optimization_summary']['convergence_reason']}
-
-ITERATIONS: {report['optimization_summary']['total_iterations']}
-Designs Evaluated: {report['optimization_summary']['designs_evaluated']}
-
-BEST DESIGN: {report['best_design']['geometry_id']}
-  Cd (drag):         {report['best_design']['Cd']:.5f}
-  Cl (lift):         {report['best_design']['Cl']:.4f}
-  L/D ratio:         {report['best_design']['L_D']:.2f}
-
-  Thickness:         {report['best_design']['thickness']:.4f}
-  Max Camber:        {report['best_design']['max_camber']:.4f}
-  Camber Position:   {report['best_design']['camber_position']:.4f}
-  Alpha (degrees):   {report['best_design']['alpha']:.2f}
-
-PERFORMANCE:
-  Initial Cd:        {report['performance']['initial_cd']:.5f if report['performance']['initial_cd'] else 'N/A'}
-  Final Cd:          {report['performance']['final_cd']:.5f if report['performance']['final_cd'] else 'N/A'}
-  Improvement:       {report['performance']['improvement_pct']:.2f}%
-
-  Constraint (Cl >= {report['performance']['constraint_cl_min']}):
-    {'✓ SATISFIED' if report['performance']['constraint_satisfied'] else '✗ VIOLATED'}
-    Achieved Cl: {report['performance']['achieved_cl']:.4f}
-
-S3 LOCATION:
-  Bucket: {os.environ.get('S3_BUCKET', 'cfd-optimization-data-120569639479')}
-  Path: sessions/{session_id}/
-
-{'=' * 60}
-            """
+            summary = report['optimization_summary']
+            best = report['best_design']
+            perf = report['performance']
+            report_text = _REPORT_TEMPLATE.format_map({
+                'sep': _SEP,
+                'session_id': session_id,
+                'status': summary['status'],
+                'convergence_reason': summary['convergence_reason'],
+                'total_iterations': summary['total_iterations'],
+                'designs_evaluated': summary['designs_evaluated'],
+                'geometry_id': best['geometry_id'],
+                'Cd': best['Cd'],
+                'Cl': best['Cl'],
+                'L_D': best['L_D'],
+                'thickness': best['thickness'],
+                'max_camber': best['max_camber'],
+                'camber_position': best['camber_position'],
+                'alpha': best['alpha'],
+                'initial_cd': f"{perf['initial_cd']:.5f}" if perf['initial_cd'] else 'N/A',
+                'final_cd': f"{perf['final_cd']:.5f}" if perf['final_cd'] else 'N/A',
+                'improvement_pct': perf['improvement_pct'],
+                'constraint_cl_min': perf['constraint_cl_min'],
+                'constraint_status': '✓ SATISFIED' if perf['constraint_satisfied'] else '✗ VIOLATED',
+                'achieved_cl': perf['achieved_cl'],
+                'bucket': S3_BUCKET
+            })
 
             logger.info(report_text)
 
             report['report_text'] = report_text.strip()
 
+            # Assemble the per-evaluation history rows into design_history.csv
+            try:
+                design_storage.compact_history()
+            except Exception as compact_error:
+                logger.warning(f"Could not compact design history: {compact_error}")
+
             # Update session with final status
             try:
-                manager = SessionManager(session_id)
+                from session_manager import get_session_manager
+
+                manager = get_session_manager(session_id)
                 session_data = manager.get_session()
                 if session_data and session_data.get('status') != 'COMPLETED':
                     manager.complete_session(convergence_reason)
@@ -2,79 +2,356 @@
 Lambda function: get_next_candidates
 Proposes next optimization candidates using trust-region strategy
 """
+import functools
 import json
-import random
 import logging
+import os
+import random
+
+from agent_response import create_error_response, create_success_response
 
 # Set up logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# S3 storage modules are imported on first use, so exploration iterations and
+# calls without a session never load them
+get_design_storage = None
+get_session_manager = None
+
+# Shared generator, reseeded per request in lambda_handler
+_RNG = random.Random()
+
+
+@functools.cache
+def _ensure_s3_loaded():
+    """Import the S3 storage modules once; return True if they are available."""
+    global get_design_storage, get_session_manager
+    try:
+        from storage_s3 import get_design_storage
+        from session_manager import get_session_manager
+    except ImportError:
+        logger.warning("S3 storage modules not available")
+        return False
+    return True
+
+
+# Design parameters: (name, center, trust-radius scale, lower bound, upper bound, decimals)
+_PARAM_SPECS = (
+    ("thickness", 0.12, 1.0, 0.08, 0.20, 4),
+    ("max_camber", 0.04, 0.5, 0.0, 0.08, 4),
+    ("camber_position", 0.40, 5.0, 0.2, 0.6, 4),
+    ("alpha", 2.0, 50.0, -2, 10, 2),
+)
+
+
+def _to_int(value):
+    """Parse an integer that may arrive as '3' or '3.0'."""
+    return int(float(value))
+
+
+def _to_design(value):
+    """Parse best_design, which arrives as a JSON string from the agent."""
+    design = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(design, dict):
+        raise ValueError(f"expected a JSON object, got {type(design).__name__}")
+    return design
+
+
+# Action-group properties: name -> (converter, default)
+_SCHEMA = {
+    'iteration_number': (_to_int, 1),
+    'current_best_cd': (float, 0.015),
+    'constraint_cl_min': (float, 0.30),
+    'session_id': (str, None),
+    'best_design': (_to_design, None),
+}
+
+
+def parse_properties(properties):
+    """
+    Convert Bedrock Agent properties to typed parameters in one pass.
+
+    Every _SCHEMA key is present in the result; values that fail to convert
+    keep their default. Properties not in the schema are passed through as-is.
+
+    Returns:
+        dict of parameter name -> value
+    """
+    params = {name: default for name, (_, default) in _SCHEMA.items()}
+    for prop in properties:
+        name = prop['name']
+        value = prop.get('value')
+        if name not in _SCHEMA:
+            params[name] = value
+            continue
+        if value is None:
+            continue
+        try:
+            params[name] = _SCHEMA[name][0](value)
+        except (TypeError, ValueError) as e:
+            logger.warning("Ignoring invalid %s=%r: %s", name, value, e)
+    return params
+
+
+# Strategy per iteration phase: (strategy, trust radius, number of candidates),
+# indexed by (iteration > 2) + (iteration > 5)
+_STRATEGY_TABLE = (
+    ("explore", 0.015, 5),
+    ("exploit", 0.010, 4),
+    ("refine", 0.005, 3),
+)
+
+
+def get_optimization_strategy(iteration_number):
+    """
+    Pick the search strategy for an iteration.
+
+    Iterations 1-2 explore, 3-5 exploit, and later iterations refine.
+
+    Returns:
+        tuple: (strategy name, trust radius, number of candidates)
+    """
+    return _STRATEGY_TABLE[(iteration_number > 2) + (iteration_number > 5)]
+
+
+# Adaptive trust region (TuRBO-style): the radius doubles after
+# _TR_SUCCESS_TOLERANCE consecutive improvements and halves after a
+# batch-size dependent run of failures, within [_TR_MIN_RADIUS, _TR_MAX_RADIUS]
+_TR_SUCCESS_TOLERANCE = 3
+_TR_MIN_RADIUS = 0.0025
+_TR_MAX_RADIUS = 0.03
+
+
+def update_trust_region(state, iteration_number, best_cd, trust_radius, num_candidates):
+    """
+    Advance the adaptive trust-region state by one iteration.
+
+    Args:
+        state: Previous state dict from the session (None on first use)
+        iteration_number: Current iteration; repeated calls for the same
+            iteration don't advance the counters again
+        best_cd: Best Cd found so far (None if unknown)
+        trust_radius: Phase radius from get_optimization_strategy, used to
+            seed the state
+        num_candidates: Batch size, which sets the failure tolerance
+
+    Returns:
+        dict: New state with 'radius', 'success', 'fail', 'best_cd', 'iteration'
+    """
+    if not state:
+        return {'radius': trust_radius, 'success': 0, 'fail': 0,
+                'best_cd': best_cd, 'iteration': iteration_number}
+
+    state = dict(state)
+    if iteration_number <= state.get('iteration', 0) or best_cd is None:
+        return state
+    state['iteration'] = iteration_number
+
+    previous_cd = state.get('best_cd')
+    if previous_cd is None or best_cd < previous_cd:
+        state['success'] += 1
+        state['fail'] = 0
+        state['best_cd'] = best_cd
+    else:
+        state['fail'] += 1
+        state['success'] = 0
+
+    # ceil(max(4, d) / batch) as integer ceiling division
+    fail_tolerance = -(-max(4, len(_PARAM_SPECS)) // num_candidates)
+
+    if state['success'] >= _TR_SUCCESS_TOLERANCE:
+        state['radius'] = min(state['radius'] * 2, _TR_MAX_RADIUS)
+        state['success'] = 0
+    elif state['fail'] >= fail_tolerance:
+        state['radius'] = max(state['radius'] / 2, _TR_MIN_RADIUS)
+        state['fail'] = 0
+
+    return state
+
+
+def adapt_trust_radius(session_id, iteration_number, best_design, trust_radius, num_candidates):
+    """
+    Update the session's adaptive trust region and return the radius to use.
+
+    The state is kept under 'trust_region' in the session metadata.
+
+    Returns:
+        float: Trust radius for this iteration
+    """
+    manager = get_session_manager(session_id)
+    session = manager.get_session()
+    if session is None:
+        return trust_radius
+
+    best_cd = best_design.get('Cd') if best_design else None
+    if not isinstance(best_cd, (int, float)):
+        best_cd = None
+
+    previous = session.get('trust_region')
+    state = update_trust_region(previous, iteration_number, best_cd,
+                                trust_radius, num_candidates)
+    if state != previous:
+        manager.update_session({'trust_region': state})
+
+    return state['radius']
+
+
+def _latin_hypercube(num_samples, num_dims, rng):
+    """
+    Latin hypercube sample in [-1, 1]^num_dims.
+
+    Each dimension is split into num_samples equal strata and every stratum
+    is hit exactly once, so a handful of samples covers the box evenly
+    instead of clustering the way independent uniform draws can.
+
+    Returns:
+        list of num_samples tuples, each with num_dims coordinates
+    """
+    unit = rng.random
+    columns = []
+    for _ in range(num_dims):
+        column = [
+            2.0 * (i + unit()) / num_samples - 1.0
+            for i in range(num_samples)
+        ]
+        rng.shuffle(column)
+        columns.append(column)
+    return list(zip(*columns))
+
+
+def generate_trust_region_candidates(num_candidates, trust_radius, best_design=None,
+                                     stratified=False, rng=None):
+    """
+    Draw candidates within the trust region around the best design.
+
+    Args:
+        num_candidates: Number of parameter sets to generate
+        trust_radius: Base perturbation radius (scaled per parameter)
+        best_design: Optional dict of current best parameters to center on;
+            missing or non-numeric fields fall back to the default design
+        stratified: Use Latin hypercube sampling instead of independent
+            uniform draws (better coverage for exploration)
+        rng: random.Random instance to draw from (module generator if omitted)
+
+    Returns:
+        list of candidate parameter dicts, clipped to the valid bounds
+    """
+    best_design = best_design or {}
+    rng = rng or _RNG
+    specs = []
+    for name, default, scale, low, high, digits in _PARAM_SPECS:
+        center = best_design.get(name, default)
+        if not isinstance(center, (int, float)):
+            center = default
+        specs.append((name, center, trust_radius * scale, low, high, 10 ** digits))
+
+    if stratified:
+        unit_samples = _latin_hypercube(num_candidates, len(specs), rng)
+    else:
+        uniform = rng.uniform
+        unit_samples = [
+            [uniform(-1.0, 1.0) for _ in specs]
+            for _ in range(num_candidates)
+        ]
+
+    # round(x * q) / q quantizes to the spec's decimals without the slower
+    # decimal-digit path of round(x, digits)
+    return [
+        {
+            name: round(max(low, min(high, center + radius * u)) * q) / q
+            for (name, center, radius, low, high, q), u in zip(specs, sample)
+        }
+        for sample in unit_samples
+    ]
+
+
+def analyze_design_history_s3(session_id, constraint_cl_min):
+    """
+    Look up the session's best design in S3.
+
+    Tries the best.json summary first (one small GET) and only falls back to
+    scanning every design when it's missing or violates constraint_cl_min
+    (e.g. it was selected under a looser constraint).
+
+    Returns:
+        dict with the best design parameters, or None
+    """
+    storage = get_design_storage(session_id)
+
+    best = storage.read_best_summary()
+    if best is None:
+        logger.info("No best.json summary - scanning design history")
+        best = storage.get_best_design(constraint_cl_min=constraint_cl_min)
+    elif best.get('Cl', 0) < constraint_cl_min:
+        logger.info("best.json Cl %s below cl_min %s - scanning design history",
+                    best.get('Cl'), constraint_cl_min)
+        best = storage.get_best_design(constraint_cl_min=constraint_cl_min)
+
+    return best
 
 
 def lambda_handler(event, context):
     """Get next candidate designs - Bedrock Agent compatible."""
 
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        logger.debug("Received event: %s", event)
 
         # Extract parameters from Bedrock Agent format
-        params = {}
+        properties = []
         if 'requestBody' in event and 'content' in event['requestBody']:
             content = event['requestBody']['content']
             if 'application/json' in content:
                 properties = content['application/json'].get('properties', [])
-                for prop in properties:
-                    value = prop['value']
-                    try:
-                        params[prop['name']] = float(value) if '.' in str(value) else int(value) if str(
-                            value).isdigit() else value
-                    except:
-                        params[prop['name']] = value
+        params = parse_properties(properties)
 
-        logger.info(f"Extracted parameters: {params}")
+        logger.info("Extracted parameters: %s", params)
 
-        current_best_cd = params.get('current_best_cd', 0.015)
-        iteration_number = int(params.get('iteration_number', 1))
-        constraint_cl_min = params.get('constraint_cl_min', 0.30)
-        session_id = event.get('session_id')
+        iteration_number = params['iteration_number']
+        constraint_cl_min = params['constraint_cl_min']
+        session_id = params['session_id'] or event.get('sessionId') or event.get('session_id')
+        best_design = params['best_design']
 
         if not session_id:
             logger.warning("⚠ Warning: No session_id provided, cannot read S3 history")
 
         # Determine strategy based on iteration
-        if iteration_number <= 2:
-            strategy = "explore"
-            trust_radius = 0.015
-            num_candidates = 5
-        elif iteration_number <= 5:
-            strategy = "exploit"
-            trust_radius = 0.010
-            num_candidates = 4
-        else:
-            strategy = "refine"
-            trust_radius = 0.005
-            num_candidates = 3
-
-        logger.info(f"Strategy: {strategy}, Trust radius: {trust_radius}")
+        strategy, trust_radius, num_candidates = get_optimization_strategy(iteration_number)
 
-        # Generate candidate designs
-        candidates = []
+        logger.info("Strategy: %s, Trust radius: %s", strategy, trust_radius)
+
+        # Center on the stored best design when the agent didn't supply one.
+        # Exploration samples the whole region around the baseline, so the
+        # history read is skipped there.
+        if best_design is None and strategy != "explore" and session_id and _ensure_s3_loaded():
+            try:
+                best_design = analyze_design_history_s3(session_id, constraint_cl_min)
+            except Exception as s3_error:
+                logger.warning("Could not read design history from S3: %s", s3_error)
 
-        for i in range(num_candidates):
-            # Perturb around reasonable values
-            thickness = max(0.08, min(0.20, 0.12 + random.uniform(-trust_radius, trust_radius)))
-            max_camber = max(0.0, min(0.08, 0.04 + random.uniform(-trust_radius / 2, trust_radius / 2)))
-            camber_position = max(0.2, min(0.6, 0.40 + random.uniform(-trust_radius * 5, trust_radius * 5)))
-            alpha = max(-2, min(10, 2.0 + random.uniform(-trust_radius * 50, trust_radius * 50)))
+        # Past exploration, grow or shrink the radius based on recent progress
+        if strategy != "explore" and session_id and _ensure_s3_loaded():
+            try:
+                trust_radius = adapt_trust_radius(
+                    session_id, iteration_number, best_design, trust_radius, num_candidates
+                )
+                logger.info("Adaptive trust radius: %s", trust_radius)
+            except Exception as session_error:
+                logger.warning("Could not update trust region state: %s", session_error)
 
-            candidates.append({
-                "thickness": round(thickness, 4),
-                "max_camber": round(max_camber, 4),
-                "camber_position": round(camber_position, 4),
-                "alpha": round(alpha, 2)
-            })
+        # Seed from the request ID so a logged invocation can be replayed
+        seed = getattr(context, 'aws_request_id', None)
+        logger.info("Candidate RNG seed: %s", seed)
+        _RNG.seed(seed)
 
-        logger.info(f"Generated {num_candidates} candidates with strategy '{strategy}'")
+        # Generate candidate designs
+        candidates = generate_trust_region_candidates(
+            num_candidates, trust_radius, best_design,
+            stratified=(strategy == "explore"),
+            rng=_RNG
+        )
+
+        logger.info("Generated %d candidates with strategy '%s'", num_candidates, strategy)
 
         result = {
             "candidates": candidates,
@@ -85,35 +362,9 @@ def lambda_handler(event, context):
         }
 
         # Return in Bedrock Agent format
-        return {
-            "messageVersion": "1.0",
-            "response": {
-                "actionGroup": event.get('actionGroup', ''),
-                "apiPath": event.get('apiPath', ''),
-                "httpMethod": event.get('httpMethod', ''),
-                "httpStatusCode": 200,
-                "responseBody": {
-                    "application/json": {
-                        "body": json.dumps(result)
-                    }
-                }
-            }
-        }
+        return create_success_response(event, result)
 
     except Exception as e:
-        logger.error(f"ERROR: {str(e)}", exc_info=True)
-
-        return {
-            "messageVersion": "1.0",
-            "response": {
-                "actionGroup": event.get('actionGroup', ''),
-                "apiPath": event.get('apiPath', ''),
-                "httpMethod": event.get('httpMethod', ''),
-                "httpStatusCode": 500,
-                "responseBody": {
-                    "application/json": {
-                        "body": json.dumps({"error": str(e)})
-                    }
-                }
-            }
-        }
\ No newline at end of file
+        logger.error("ERROR: %s", e, exc_info=True)
+
+        return create_error_response(event, str(e))
@@ -6,30 +6,37 @@ Shows actual import errors instead of hiding them.
 
 import json
 import os
+import secrets
+import time
 from datetime import datetime
-import uuid
 import logging
-import traceback
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Bucket shown in logs and reports
+S3_BUCKET = os.environ.get('S3_BUCKET', 'cfd-optimization-data-120569639479')
+
 # Try to import S3 storage modules - SHOW THE ACTUAL ERROR
 S3_ENABLED = False
 IMPORT_ERROR = None
 
 try:
-    from session_manager import SessionManager
+    from session_manager import SessionManager, get_s3_client
 
     S3_ENABLED = True
     logger.info("✓ Successfully imported S3 storage modules")
 except Exception as e:
     IMPORT_ERROR = str(e)
-    logger.error(f"✗ Failed to import S3 modules: {e}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
+    logger.error("✗ Failed to import S3 modules: %s", e, exc_info=True)
     S3_ENABLED = False
 
+# Build the (cached) S3 client during INIT, which runs at full CPU and isn't
+# billed as handler time, instead of on the first create_session call
+if S3_ENABLED and os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    get_s3_client()
+
 
 def lambda_handler(event, context):
     """
@@ -38,15 +45,16 @@ def lambda_handler(event, context):
 
     try:
         logger.info("Starting optimization initialization with S3 storage")
-        logger.info(f"S3_ENABLED: {S3_ENABLED}")
+        logger.info("S3_ENABLED: %s", S3_ENABLED)
         if not S3_ENABLED:
-            logger.warning(f"Import error was: {IMPORT_ERROR}")
+            logger.warning("Import error was: %s", IMPORT_ERROR)
 
-        logger.info(f"Input event: {json.dumps(event)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Input event: %s", json.dumps(event, default=str))
 
         # Generate unique session ID
-        session_id = f"opt-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{str(uuid.uuid4())[:8]}"
-        logger.info(f"Generated session ID: {session_id}")
+        session_id = f"opt-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{secrets.token_hex(4)}"
+        logger.info("Generated session ID: %s", session_id)
 
         # Extract optimization parameters from input
         objective = event.get('objective', 'minimize_cd')
@@ -67,20 +75,18 @@ def lambda_handler(event, context):
             try:
                 manager = SessionManager(session_id)
                 session_data = manager.create_session(config)
-                logger.info(f"✓ Created session in S3: {session_id}")
+                logger.info("✓ Created session in S3: %s", session_id)
 
                 # Log S3 location
-                bucket = os.environ.get('S3_BUCKET', 'cfd-optimization-data-120569639479')
-                logger.info(f"  S3 Location: s3://{bucket}/sessions/{session_id}/")
+                logger.info("  S3 Location: s3://%s/sessions/%s/", S3_BUCKET, session_id)
 
             except Exception as s3_error:
-                logger.error(f"Failed to create S3 session: {s3_error}")
-                logger.error(f"Traceback: {traceback.format_exc()}")
+                logger.error("Failed to create S3 session: %s", s3_error, exc_info=True)
                 # Don't fail the function - continue with local-only mode
                 logger.warning("Continuing without S3 storage")
         else:
             logger.warning("S3 storage not enabled - running in local mode")
-            logger.warning(f"Reason: {IMPORT_ERROR}")
+            logger.warning("Reason: %s", IMPORT_ERROR)
 
         # Prepare response
         response = {
@@ -97,7 +103,9 @@ def lambda_handler(event, context):
             'import_error': IMPORT_ERROR if not S3_ENABLED else None
         }
 
-        logger.info(f"Initialization complete: {json.dumps(response)}")
+        logger.info("Initialization complete: %s", session_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Initialization response: %s", json.dumps(response))
 
         # Return data directly for Step Functions (no statusCode wrapper)
         return {
@@ -115,7 +123,9 @@ def lambda_handler(event, context):
         }
 
     except Exception as e:
-        logger.error(f"Error initializing optimization: {str(e)}", exc_info=True)
+        import traceback
+
+        logger.error("Error initializing optimization: %s", e, exc_info=True)
         return {
             'statusCode': 500,
             'body': {
@@ -7,21 +7,43 @@ Purpose: Wrapper Lambda to invoke Bedrock Agent from Step Functions
 - Returns agent response
 """
 
-import json
-import boto3
+import functools
 import logging
+import os
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize Bedrock Agent Runtime client
-bedrock_agent = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
-
 # Agent configuration
 AGENT_ID = "MXUZMBTQFV"
 AGENT_ALIAS_ID = "TSTALIASID"
 
+# Agent prompt with session context; filled with str.format_map in lambda_handler
+_INPUT_TEMPLATE = """
+{input_text}
+
+Session ID: {session_id}
+Current iteration: {iteration}
+
+IMPORTANT: When calling tools (generate_geometry, run_cfd, get_next_candidates), 
+always include the session_id parameter with value "{session_id}".
+This ensures all data is stored in the correct S3 location.
+"""
+
+
+@functools.cache
+def get_bedrock_agent_client():
+    """Get or create the Bedrock Agent Runtime client (cached per container)."""
+    import boto3
+    return boto3.client('bedrock-agent-runtime', region_name='us-east-1')
+
+
+# Inside Lambda, build the client during INIT so the first invocation doesn't
+# pay for it; plain imports (local tools, tests) stay free of boto3
+if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    get_bedrock_agent_client()
+
 
 def lambda_handler(event, context):
     """
@@ -48,39 +70,35 @@ def lambda_handler(event, context):
         input_text = event.get('inputText', 'Continue optimization iteration')
         iteration = event.get('iteration', 0)
 
-        logger.info(f"Invoking Bedrock Agent - Session: {session_id}, Iteration: {iteration}")
-        logger.info(f"Input text: {input_text}")
+        logger.info("Invoking Bedrock Agent - Session: %s, Iteration: %s", session_id, iteration)
+        logger.debug("Input text: %s", input_text)
 
         # Enhanced input text with session context
         # This helps the agent understand which session to work with
-        enhanced_input = f"""
-{input_text}
-
-Session ID: {session_id}
-Current iteration: {iteration}
-
-IMPORTANT: When calling tools (generate_geometry, run_cfd, get_next_candidates), 
-always include the session_id parameter with value "{session_id}".
-This ensures all data is stored in the correct S3 location.
-"""
+        enhanced_input = _INPUT_TEMPLATE.format_map({
+            'input_text': input_text,
+            'session_id': session_id,
+            'iteration': iteration
+        })
 
         # Invoke the agent
-        response = bedrock_agent.invoke_agent(
+        response = get_bedrock_agent_client().invoke_agent(
             agentId=AGENT_ID,
             agentAliasId=AGENT_ALIAS_ID,
             sessionId=session_id,
             inputText=enhanced_input
         )
 
-        # Parse the streaming response
-        completion = ""
-        for event in response.get('completion', []):
-            if 'chunk' in event:
-                chunk = event['chunk']
-                if 'bytes' in chunk:
-                    completion += chunk['bytes'].decode('utf-8')
+        # Collect the streamed chunks and decode once, so multi-byte
+        # characters split across chunks decode correctly
+        buf = bytearray()
+        for stream_event in response.get('completion', []):
+            chunk_bytes = stream_event.get('chunk', {}).get('bytes')
+            if chunk_bytes:
+                buf += chunk_bytes
+        completion = buf.decode('utf-8')
 
-        logger.info(f"Agent response length: {len(completion)} characters")
+        logger.info("Agent response length: %d characters", len(completion))
 
         return {
 
@@ -6,23 +6,79 @@ Enhanced to write both:
 2. Iteration summaries to iterations/
 """
 
-import json
 import logging
 import os
 import random
-from datetime import datetime
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ParamValidationError
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+from json_codec import dumps as _dumps, dumps_indented as _dumps_object, loads as _loads
 
-s3 = boto3.client('s3')
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Connection pool sized above the writer threads so concurrent PUTs don't
+# wait on "Connection pool is full"; TCP keepalive keeps pooled connections
+# usable across idle gaps between warm invocations, and short timeouts with
+# standard retries stop one slow PUT from holding the whole invocation
+s3 = boto3.client('s3', config=Config(
+    max_pool_connections=16,
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=10,
+    retries={'max_attempts': 3, 'mode': 'standard'}
+))
 BUCKET_NAME = os.environ['BUCKET_NAME']
 
+# Independent S3 writes in save_to_s3 run concurrently; reused across warm
+# invocations
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Mock aerodynamic model constants: thin-airfoil lift slope (2*pi per radian,
+# expressed per degree) and the induced-drag factor 1 / (pi * AR) (AR = 8)
+_LIFT_SLOPE_PER_DEG = 2 * 3.14159 * 3.14159 / 180
+_INDUCED_DRAG_FACTOR = 1.0 / (3.14159 * 8.0)
+
+# Header of each design_history shard (and of the compacted CSV)
+HISTORY_CSV_HEADER = "timestamp,geometry_id,Cl,Cd,L_D,converged,iterations,computation_time\n"
+
+# Noise generator for the mock solver, shared across warm invocations
+_RNG = random.Random()
+
+# Constant error body, serialized once at import
+_GEOMETRY_ID_REQUIRED_BODY = _dumps({'error': 'geometry_id is required'})
+
+
+def _wrap_json(event, status, body_json):
+    """Wrap an already-serialized JSON body in the Bedrock Agent envelope."""
+    return {
+        'messageVersion': '1.0',
+        'response': {
+            'actionGroup': event.get('actionGroup', ''),
+            'apiPath': event.get('apiPath', ''),
+            'httpMethod': event.get('httpMethod', ''),
+            'httpStatusCode': status,
+            'responseBody': {
+                'application/json': {
+                    'body': body_json
+                }
+            }
+        }
+    }
+
+
+def _wrap(event, status, body):
+    """Wrap a response body in the Bedrock Agent envelope."""
+    return _wrap_json(event, status, _dumps(body))
+
 
 def lambda_handler(event, context):
     """Handle run_cfd requests from Bedrock Agent"""
-    logger.info(f"Received event: {json.dumps(event)}")
+    logger.debug("Received event: %s", event)
 
     # Extract session_id from the EVENT ROOT (not from parameters)
     session_id = event.get('sessionId')
@@ -34,104 +90,263 @@ def lambda_handler(event, context):
     properties = app_json.get('properties', [])
 
     # Parse parameters
-    params = {}
-    for prop in properties:
-        params[prop['name']] = prop['value']
+    params = {
+        prop['name']: prop['value']
+        for prop in properties
+        if prop.get('value') is not None
+    }
 
-    logger.info(f"Extracted parameters: {params}")
-    logger.info(f"Session ID: {session_id}")
+    logger.info("Extracted parameters: %s", params)
+    logger.info("Session ID: %s", session_id)
 
     geometry_id = params.get('geometry_id')
-    reynolds = int(params.get('reynolds', 500000))
-    iteration = int(params.get('iteration', 0))  # NEW: Get iteration number
-
     if not geometry_id:
-        return {
-            'messageVersion': '1.0',
-            'response': {
-                'actionGroup': event['actionGroup'],
-                'apiPath': event['apiPath'],
-                'httpMethod': event['httpMethod'],
-                'httpStatusCode': 400,
-                'responseBody': {
-                    'application/json': {
-                        'body': json.dumps({
-                            'error': 'geometry_id is required'
-                        })
-                    }
-                }
-            }
-        }
+        return _wrap_json(event, 400, _GEOMETRY_ID_REQUIRED_BODY)
+
+    # Numbers may arrive as strings such as "500000" or "3.0"
+    try:
+        reynolds = int(float(params.get('reynolds', 500000)))
+        iteration = int(float(params.get('iteration', 0)))  # NEW: Get iteration number
+        constraint_cl_min = float(params.get('constraint_cl_min', 0.30))
+    except (TypeError, ValueError) as e:
+        return _wrap(event, 400, {'error': f'Invalid numeric parameter: {e}'})
 
-    # Run mock CFD simulation
-    results = run_mock_cfd(geometry_id, reynolds)
-    logger.info(f"CFD Results: {json.dumps(results)}")
+    try:
+        # Run mock CFD simulation
+        results = run_mock_cfd(geometry_id, reynolds)
+        logger.debug("CFD Results: %s", results)
 
-    # Save to S3 if session_id is provided
-    if session_id:
-        save_to_s3(session_id, geometry_id, results, iteration)
-    else:
-        logger.warning("⚠ Warning: No session_id provided, skipping S3 storage")
+        # Save to S3 if session_id is provided
+        if session_id:
+            save_to_s3(session_id, geometry_id, results, iteration, constraint_cl_min)
+        else:
+            logger.warning("⚠ Warning: No session_id provided, skipping S3 storage")
+    except Exception as e:
+        logger.error("Error running CFD for %s: %s", geometry_id, e, exc_info=True)
+        return _wrap(event, 500, {'error': str(e)})
 
     # Return response to agent
-    return {
-        'messageVersion': '1.0',
-        'response': {
-            'actionGroup': event['actionGroup'],
-            'apiPath': event['apiPath'],
-            'httpMethod': event['httpMethod'],
-            'httpStatusCode': 200,
-            'responseBody': {
-                'application/json': {
-                    'body': json.dumps(results)
-                }
-            }
-        }
-    }
+    return _wrap(event, 200, results)
 
 
 def run_mock_cfd(geometry_id, reynolds):
     """Generate realistic mock CFD results"""
-    # Parse NACA code from geometry_id (e.g., "NACA4410_a2.4")
-    parts = geometry_id.split('_')
-    naca_code = parts[0].replace('NACA', '')
-    alpha = float(parts[1].replace('a', '')) if len(parts) > 1 else 2.0
-
-    # Extract NACA parameters
-    max_camber = int(naca_code[0]) / 100.0
-    camber_pos = int(naca_code[1]) / 10.0
-    thickness = int(naca_code[2:4]) / 100.0
+    # Parse NACA parameters from geometry_id (e.g., "NACA4410_a2.4")
+    geometry = parse_geometry_id(geometry_id)
+    max_camber = geometry['max_camber']
+    thickness = geometry['thickness']
+    alpha = geometry['alpha']
 
     # Realistic aerodynamic correlations
-    Cl = 2 * 3.14159 * (alpha * 3.14159 / 180) + 0.1 * max_camber * 10
-    Cd_profile = 0.006 + 0.3 * thickness ** 2
-    Cd_induced = Cl ** 2 / (3.14159 * 8.0)  # Induced drag
+    Cl = _LIFT_SLOPE_PER_DEG * alpha + max_camber
+    Cd_profile = 0.006 + 0.3 * thickness * thickness
+    Cd_induced = Cl * Cl * _INDUCED_DRAG_FACTOR  # Induced drag
     Cd = Cd_profile + Cd_induced
 
-    # Add some noise
-    Cl += random.uniform(-0.02, 0.02)
-    Cd += random.uniform(-0.001, 0.001)
+    # Add some noise (uniform in +/-0.02 and +/-0.001)
+    rand = _RNG.random
+    Cl += 0.04 * rand() - 0.02
+    Cd += 0.002 * rand() - 0.001
 
     L_D = Cl / Cd if Cd > 0 else 0
 
+    # round(x * q) / q quantizes to the reported decimals without the slower
+    # round(x, ndigits) path
     return {
-        'Cl': round(Cl, 4),
-        'Cd': round(Cd, 5),
-        'L_D': round(L_D, 2),
+        'Cl': round(Cl * 1e4) / 1e4,
+        'Cd': round(Cd * 1e5) / 1e5,
+        'L_D': round(L_D * 100) / 100,
         'converged': True,
-        'iterations': random.randint(150, 300),
-        'computation_time': round(random.uniform(30, 90), 2)
+        'iterations': 150 + int(rand() * 151),
+        'computation_time': round((30 + 60 * rand()) * 100) / 100
     }
 
 
-def save_to_s3(session_id, geometry_id, results, iteration):
+# NACA 4-digit code plus optional angle of attack, e.g. NACA4410_a2.4
+_GEOMETRY_ID_RE = re.compile(r'NACA(\d)(\d)(\d{2})(?:_a([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?))?')
+
+
+def parse_geometry_id(geometry_id):
     """
-    Save CFD results to S3 in TWO places:
+    Parse a geometry ID such as "NACA4410_a2.4" into design parameters.
+
+    Returns:
+        dict with max_camber, camber_position, thickness and alpha
+    """
+    match = _GEOMETRY_ID_RE.match(geometry_id)
+    if match is None:
+        raise ValueError(f"Invalid geometry_id: {geometry_id}")
+    m, p, t, alpha = match.groups()
+
+    return {
+        'max_camber': int(m) / 100.0,
+        'camber_position': int(p) / 10.0,
+        'thickness': int(t) / 100.0,
+        'alpha': float(alpha) if alpha is not None else 2.0
+    }
+
+
+# Last best.json record this container read or wrote, per session. The
+# stored best only ever improves, so this is an upper bound on it: a design
+# that doesn't beat it can skip the best.json GET when the caller doesn't need
+# the current session best.
+_BEST_CACHE = {}
+_BEST_CACHE_MAX = 32
+
+# Attempts at the conditional best.json write before giving up on a race
+_BEST_WRITE_ATTEMPTS = 3
+
+# Cleared if the installed botocore rejects put_object(IfMatch/IfNoneMatch)
+_CONDITIONAL_PUT_SUPPORTED = True
+
+
+def _remember_best(session_id, best):
+    """Cache the latest known best record for a session."""
+    if session_id not in _BEST_CACHE and len(_BEST_CACHE) >= _BEST_CACHE_MAX:
+        _BEST_CACHE.clear()
+    _BEST_CACHE[session_id] = best
+
+
+def _read_best(best_key):
+    """GET best.json; returns (record, ETag), or (None, None) if absent."""
+    try:
+        existing = s3.get_object(Bucket=BUCKET_NAME, Key=best_key)
+    except s3.exceptions.NoSuchKey:
+        return None, None
+    return _loads(existing['Body'].read()), existing.get('ETag')
+
+
+def _put_best(best_key, best, etag):
+    """
+    Write best.json only if it is unchanged since it was read (ETag), or
+    still absent when etag is None.
+
+    Returns:
+        bool: False if another writer got there first
+    """
+    global _CONDITIONAL_PUT_SUPPORTED
+
+    kwargs = {
+        'Bucket': BUCKET_NAME,
+        'Key': best_key,
+        'Body': _dumps_object(best),
+        'ContentType': 'application/json'
+    }
+    if _CONDITIONAL_PUT_SUPPORTED:
+        if etag is None:
+            kwargs['IfNoneMatch'] = '*'
+        else:
+            kwargs['IfMatch'] = etag
+
+    try:
+        s3.put_object(**kwargs)
+    except ParamValidationError as e:
+        # Only a rejected conditional header means an old botocore
+        if not any(name in kwargs and name in str(e) for name in ('IfMatch', 'IfNoneMatch')):
+            raise
+        # botocore predates conditional writes; fall back to plain PUTs
+        _CONDITIONAL_PUT_SUPPORTED = False
+        kwargs.pop('IfMatch', None)
+        kwargs.pop('IfNoneMatch', None)
+        s3.put_object(**kwargs)
+    except ClientError as e:
+        code = e.response.get('Error', {}).get('Code')
+        if code in ('PreconditionFailed', 'ConditionalRequestConflict'):
+            return False
+        raise
+    return True
+
+
+def _beats(results, best, constraint_cl_min):
+    """True if a feasible result should replace the stored best record."""
+    return (best is None
+            or best.get('Cl', 0) < constraint_cl_min
+            or results['Cd'] < best.get('Cd', float('inf')))
+
+
+def update_best_design(session_id, geometry_id, results, timestamp, constraint_cl_min,
+                       refresh=True):
+    """
+    Keep sessions/{session_id}/best.json pointing at the lowest-Cd feasible
+    design (converged, Cl >= constraint_cl_min).
+
+    Readers (e.g. get_next_candidates) fetch this one small object instead of
+    scanning the whole design history. The record stores the cl_min it was
+    selected under so readers with a stricter constraint can fall back.
+
+    Improvements are written with a conditional PUT on the ETag that was
+    read, so concurrent containers can't overwrite a better record; a lost
+    race re-reads and re-compares.
+
+    Args:
+        refresh: Return the current stored best even when this design can't
+            improve on it (costs one GET); with False, the container's cached
+            best may be returned instead
+
+    Returns:
+        dict: The best design record after this evaluation, or None if the
+        current design isn't feasible and no best exists yet
+    """
+    best_key = f"sessions/{session_id}/best.json"
+    feasible = bool(results.get('converged')) and results['Cl'] >= constraint_cl_min
+
+    # Only skips the GET; the cached record is never written back or used to
+    # decide that this design is an improvement
+    cached = _BEST_CACHE.get(session_id)
+    if not refresh and cached is not None and (
+            not feasible or not _beats(results, cached, constraint_cl_min)):
+        return cached
+
+    for _ in range(_BEST_WRITE_ATTEMPTS):
+        best, etag = _read_best(best_key)
+        if best is not None:
+            _remember_best(session_id, best)
+
+        if not feasible or not _beats(results, best, constraint_cl_min):
+            return best
+
+        new_best = {
+            'geometry_id': geometry_id,
+            'timestamp': timestamp,
+            'Cd': results['Cd'],
+            'Cl': results['Cl'],
+            'L_D': results['L_D'],
+            'cl_min': constraint_cl_min,
+            **parse_geometry_id(geometry_id)
+        }
+
+        if _put_best(best_key, new_best, etag):
+            logger.info("✓ New best design %s (Cd=%s): %s", geometry_id, results['Cd'], best_key)
+            _remember_best(session_id, new_best)
+            return new_best
+
+        logger.info("best.json changed concurrently; re-reading for %s", geometry_id)
+
+    logger.warning("Gave up updating best.json for %s after %d conflicting writes",
+                   geometry_id, _BEST_WRITE_ATTEMPTS)
+    best, _ = _read_best(best_key)
+    return best
+
+
+def _put(key, body, content_type):
+    """PUT one object to the results bucket."""
+    s3.put_object(Bucket=BUCKET_NAME, Key=key, Body=body, ContentType=content_type)
+    logger.info("✓ Saved to S3: %s", key)
+
+
+def save_to_s3(session_id, geometry_id, results, iteration, constraint_cl_min=0.30):
+    """
+    Save CFD results to S3:
     1. Individual design result: designs/{geometry_id}.json
-    2. Iteration summary: iterations/iteration_{N}.json
+    2. design_history row: history/part-{iteration}-{geometry_id}.csv
+    3. Best-so-far summary: best.json (only rewritten on a feasible improvement)
+    4. Iteration summary: iterations/iteration_{N}.json
     """
+    pending = []
+    error = None
     try:
-        timestamp = datetime.utcnow().isoformat()
+        # Microseconds kept: get_latest_designs orders designs by this value
+        timestamp = datetime.now(timezone.utc).isoformat()
 
         # ============================================================
         # PART 1: Save individual design result
@@ -143,58 +358,40 @@ def save_to_s3(session_id, geometry_id, results, iteration):
             **results
         }
 
-        s3.put_object(
-            Bucket=BUCKET_NAME,
-            Key=design_key,
-            Body=json.dumps(design_data, indent=2),
-            ContentType='application/json'
-        )
-
-        logger.info(f"✓ Saved design to S3: {design_key}")
+        pending.append(_EXECUTOR.submit(
+            _put, design_key, _dumps_object(design_data), 'application/json'
+        ))
 
         # ============================================================
-        # PART 2: Append to design_history.csv
+        # PART 2: Write this evaluation's design_history row
         # ============================================================
-        csv_key = f"sessions/{session_id}/design_history.csv"
-
-        # Try to read existing CSV
-        try:
-            existing = s3.get_object(Bucket=BUCKET_NAME, Key=csv_key)
-            csv_content = existing['Body'].read().decode('utf-8')
-        except s3.exceptions.NoSuchKey:
-            # Create new CSV with header
-            csv_content = "timestamp,geometry_id,Cl,Cd,L_D,converged,iterations,computation_time\n"
-
-        # Append new row
+        # One immutable shard per row instead of a GET + rewrite of a
+        # growing CSV; generate_report compacts the shards into
+        # design_history.csv at the end of the run
+        shard_key = (f"sessions/{session_id}/history/"
+                     f"part-{iteration:06d}-{geometry_id}.csv")
         csv_row = f"{timestamp},{geometry_id},{results['Cl']},{results['Cd']},{results['L_D']},{results['converged']},{results['iterations']},{results['computation_time']}\n"
-        csv_content += csv_row
 
-        s3.put_object(
-            Bucket=BUCKET_NAME,
-            Key=csv_key,
-            Body=csv_content.encode('utf-8'),
-            ContentType='text/csv'
-        )
+        pending.append(_EXECUTOR.submit(
+            _put, shard_key, (HISTORY_CSV_HEADER + csv_row).encode('utf-8'), 'text/csv'
+        ))
 
-        logger.info(f"✓ Updated design_history.csv: {csv_key}")
+        # ============================================================
+        # PART 3: Update best-so-far summary (best.json)
+        # ============================================================
+        # Runs here while the PUTs above are in flight. The iteration
+        # summary reports the session best, so it needs the stored value
+        # rather than this container's cached one
+        best = update_best_design(session_id, geometry_id, results, timestamp,
+                                  constraint_cl_min, refresh=iteration > 0)
+        best_cd = best['Cd'] if best else results['Cd']
 
         # ============================================================
-        # PART 3: NEW - Write iteration summary
+        # PART 4: Write iteration summary
         # ============================================================
         if iteration > 0:  # Only write iteration summary if iteration number provided
             iteration_key = f"sessions/{session_id}/iterations/iteration_{iteration:03d}.json"
 
-            # Read current best from design_history to track progress
-            best_cd = results['Cd']
-            try:
-                # Parse CSV to find best Cd so far
-                lines = csv_content.strip().split('\n')[1:]  # Skip header
-                if lines:
-                    cds = [float(line.split(',')[3]) for line in lines if line]
-                    best_cd = min(cds)
-            except:
-                pass
-
             iteration_data = {
                 'iteration': iteration,
                 'timestamp': timestamp,
@@ -205,17 +402,24 @@ def save_to_s3(session_id, geometry_id, results, iteration):
                 'notes': f'CFD evaluation of {geometry_id}'
             }
 
-            s3.put_object(
-                Bucket=BUCKET_NAME,
-                Key=iteration_key,
-                Body=json.dumps(iteration_data, indent=2),
-                ContentType='application/json'
-            )
-
-            logger.info(f"✓ Saved iteration summary: {iteration_key}")
+            pending.append(_EXECUTOR.submit(
+                _put, iteration_key, _dumps_object(iteration_data), 'application/json'
+            ))
         else:
-            logger.info(f"⚠ No iteration number provided, skipping iteration summary")
+            logger.info("⚠ No iteration number provided, skipping iteration summary")
+
+        # Re-raise the first write failure
+        for future in pending:
+            future.result()
 
     except Exception as e:
-        logger.error(f"Error saving to S3: {str(e)}")
-        raise
\ No newline at end of file
+        error = e
+        logger.error("Error saving to S3: %s", e)
+        raise
+    finally:
+        # Never return (or propagate an error) with PUTs still in flight, and
+        # surface every failed write other than the one logged above
+        for future in wait(pending).done:
+            failure = future.exception()
+            if failure is not None and failure is not error:
+                logger.error("S3 write failed: %s", failure)
\ No newline at end of file
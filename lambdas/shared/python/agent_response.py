@@ -0,0 +1,52 @@
+"""
+Bedrock Agent action-group response envelopes shared by the tool Lambdas
+(generate_geometry, get_next_candidates).
+"""
+
+from json_codec import dumps as _dumps
+
+# Bedrock Agent response envelopes; only the per-request fields change per call
+_SUCCESS_TEMPLATE = {
+    "messageVersion": "1.0",
+    "response": {
+        "actionGroup": "",
+        "apiPath": "",
+        "httpMethod": "",
+        "httpStatusCode": 200,
+        "responseBody": None
+    }
+}
+_ERROR_TEMPLATE = {
+    "messageVersion": "1.0",
+    "response": {
+        **_SUCCESS_TEMPLATE["response"],
+        "httpStatusCode": 500
+    }
+}
+
+
+def _fill_template(template, event, body):
+    """Copy a response template and fill in the event fields and JSON body."""
+    resp = template.copy()
+    resp["response"] = {
+        **template["response"],
+        "actionGroup": event.get('actionGroup', ''),
+        "apiPath": event.get('apiPath', ''),
+        "httpMethod": event.get('httpMethod', ''),
+        "responseBody": {
+            "application/json": {
+                "body": _dumps(body)
+            }
+        }
+    }
+    return resp
+
+
+def create_success_response(event, result):
+    """Wrap a result dict in the Bedrock Agent success envelope."""
+    return _fill_template(_SUCCESS_TEMPLATE, event, result)
+
+
+def create_error_response(event, message):
+    """Wrap an error message in the Bedrock Agent error envelope."""
+    return _fill_template(_ERROR_TEMPLATE, event, {"error": message})
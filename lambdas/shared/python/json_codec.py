@@ -0,0 +1,47 @@
+"""
+JSON encoding shared by the Lambda handlers and storage modules.
+
+Uses orjson (packaged with the shared layer and each function's deployment
+zip) and falls back to stdlib json when it isn't installed, e.g. when running
+the modules locally.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# True when the fast path is active; logged by callers that care
+ORJSON_AVAILABLE = orjson is not None
+
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        """Serialize to a compact JSON string (e.g. a Bedrock response body)."""
+        return orjson.dumps(obj).decode()
+
+    def dumps_bytes(obj) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes for an S3 object body."""
+        return orjson.dumps(obj)
+
+    def dumps_indented(obj) -> bytes:
+        """Serialize to 2-space indented UTF-8 JSON bytes for an S3 object body."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    loads = json.loads
+
+    def dumps(obj) -> str:
+        """Serialize to a compact JSON string (e.g. a Bedrock response body)."""
+        return json.dumps(obj, separators=(',', ':'))
+
+    def dumps_bytes(obj) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes for an S3 object body."""
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps_indented(obj) -> bytes:
+        """Serialize to 2-space indented UTF-8 JSON bytes for an S3 object body."""
+        return json.dumps(obj, indent=2).encode('utf-8')
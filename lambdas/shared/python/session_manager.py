@@ -8,29 +8,44 @@ Provides a clean interface for:
 - Tracking session progress
 """
 
-import json
+import functools
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import Dict, Optional
 import logging
 
+from json_codec import dumps_indented as _dumps_object, loads as _loads
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Get S3 bucket from environment
 S3_BUCKET = os.environ.get('S3_BUCKET', 'cfd-optimization-data-120569639479-us-east-1')
 
-# Lazy initialization of boto3 client
-_s3_client = None
 
+def _utc_now() -> str:
+    """Current UTC time as ISO 8601 to the second, with an explicit offset."""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+# Cleared if the installed botocore rejects put_object(IfMatch=...)
+_IF_MATCH_SUPPORTED = True
+
+# Seconds a session document stays fresh enough to update without If-Match
+_SNAPSHOT_MAX_AGE = 0.2
 
+
+@functools.cache
 def get_s3_client():
-    """Get or create S3 client (lazy initialization)."""
-    global _s3_client
-    if _s3_client is None:
-        import boto3
-        _s3_client = boto3.client('s3')
-    return _s3_client
+    """Get or create S3 client (lazy initialization, cached per container)."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client('s3', config=Config(
+        max_pool_connections=16,
+        retries={'max_attempts': 3, 'mode': 'standard'}
+    ))
 
 
 class SessionManager:
@@ -41,17 +56,27 @@ class SessionManager:
     s3://bucket/sessions/{session_id}/session.json
     """
 
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, s3_client=None):
         """
         Initialize session manager.
 
         Args:
             session_id: Unique identifier for this optimization session
+            s3_client: boto3 S3 client to use (defaults to the shared client)
         """
         self.session_id = session_id
         self.bucket = S3_BUCKET
+        self.s3_client = s3_client or get_s3_client()
+        self._no_such_key = self.s3_client.exceptions.NoSuchKey
         self.key = f"sessions/{session_id}/session.json"
 
+        # Last session document read or written by this instance, its ETag and
+        # when it was taken; used for conditional (If-Match) updates without a
+        # fresh GET
+        self._snapshot = None
+        self._etag = None
+        self._snapshot_at = 0.0
+
         logger.info(f"Initialized SessionManager for {session_id}")
 
     def create_session(self, config: Dict) -> Dict:
@@ -70,7 +95,7 @@ class SessionManager:
         """
         session_data = {
             'session_id': self.session_id,
-            'created_at': datetime.utcnow().isoformat(),
+            'created_at': _utc_now(),
             'status': 'RUNNING',
             'config': config,
             'current_iteration': 0,
@@ -81,13 +106,7 @@ class SessionManager:
         }
 
         try:
-            s3_client = get_s3_client()
-            s3_client.put_object(
-                Bucket=self.bucket,
-                Key=self.key,
-                Body=json.dumps(session_data, indent=2),
-                ContentType='application/json'
-            )
+            self._put_session(session_data)
             logger.info(f"Created session {self.session_id}")
             return session_data
         except Exception as e:
@@ -102,49 +121,106 @@ class SessionManager:
             dict: Session metadata, or None if not found
         """
         try:
-            s3_client = get_s3_client()
+            s3_client = self.s3_client
             response = s3_client.get_object(Bucket=self.bucket, Key=self.key)
-            session_data = json.loads(response['Body'].read())
+            session_data = _loads(response['Body'].read())
+            self._snapshot = session_data
+            self._etag = response.get('ETag')
+            self._snapshot_at = time.monotonic()
             logger.info(f"Retrieved session {self.session_id}")
-            return session_data
-        except get_s3_client().exceptions.NoSuchKey:
+            return dict(session_data)
+        except self._no_such_key:
             logger.warning(f"Session {self.session_id} not found")
             return None
         except Exception as e:
             logger.error(f"Failed to retrieve session: {e}")
             raise
 
+    def _put_session(self, session_data: Dict, if_match: Optional[str] = None):
+        """
+        Write the session document, optionally only if its ETag still matches.
+
+        Raises:
+            ClientError with code PreconditionFailed if if_match is stale
+        """
+        global _IF_MATCH_SUPPORTED
+        from botocore.exceptions import ParamValidationError
+
+        kwargs = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+            'Body': _dumps_object(session_data),
+            'ContentType': 'application/json'
+        }
+        if if_match and _IF_MATCH_SUPPORTED:
+            kwargs['IfMatch'] = if_match
+
+        try:
+            response = self.s3_client.put_object(**kwargs)
+        except ParamValidationError as e:
+            # Only a rejected IfMatch means an old botocore; anything else is
+            # a real validation error
+            if 'IfMatch' not in kwargs or 'IfMatch' not in str(e):
+                raise
+            # botocore predates conditional writes; fall back to plain PUTs
+            # (update_session then always re-reads before writing)
+            _IF_MATCH_SUPPORTED = False
+            kwargs.pop('IfMatch')
+            response = self.s3_client.put_object(**kwargs)
+
+        self._snapshot = session_data
+        self._etag = response.get('ETag')
+        self._snapshot_at = time.monotonic()
+
     def update_session(self, updates: Dict):
         """
         Update session metadata.
 
+        Writes are conditional on the ETag of the last document this manager
+        read or wrote, so the common case is a single PUT. If another writer
+        changed the session in between, the PUT fails with PreconditionFailed
+        and the update is retried once on a fresh read.
+
         Args:
             updates: dict with fields to update
         """
-        # Get current session data
-        session_data = self.get_session()
-
-        if session_data is None:
-            logger.error(f"Cannot update non-existent session {self.session_id}")
-            return
-
-        # Update fields
-        session_data.update(updates)
-        session_data['updated_at'] = datetime.utcnow().isoformat()
+        # Reuse the last known document when writes can be made conditional,
+        # or (unconditional fallback) when it was read moments ago, as in
+        # get_session() followed by complete_session()
+        if self._snapshot is None or (
+            not _IF_MATCH_SUPPORTED
+            and time.monotonic() - self._snapshot_at > _SNAPSHOT_MAX_AGE
+        ):
+            self.get_session()
+
+        for attempt in range(2):
+            if self._snapshot is None:
+                logger.error(f"Cannot update non-existent session {self.session_id}")
+                return
+
+            # Update fields
+            session_data = {
+                **self._snapshot,
+                **updates,
+                'updated_at': _utc_now()
+            }
 
-        # Write back to S3
-        try:
-            s3_client = get_s3_client()
-            s3_client.put_object(
-                Bucket=self.bucket,
-                Key=self.key,
-                Body=json.dumps(session_data, indent=2),
-                ContentType='application/json'
-            )
-            logger.info(f"Updated session {self.session_id}")
-        except Exception as e:
-            logger.error(f"Failed to update session: {e}")
-            raise
+            # Write back to S3
+            try:
+                self._put_session(session_data, if_match=self._etag)
+                logger.info(f"Updated session {self.session_id}")
+                return
+            except self.s3_client.exceptions.ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if attempt == 0 and code in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                    logger.info(f"Session {self.session_id} changed concurrently; retrying update")
+                    self.get_session()
+                    continue
+                logger.error(f"Failed to update session: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Failed to update session: {e}")
+                raise
 
     def complete_session(self, reason: str):
         """
@@ -155,7 +231,7 @@ class SessionManager:
         """
         self.update_session({
             'status': 'COMPLETED',
-            'completed_at': datetime.utcnow().isoformat(),
+            'completed_at': _utc_now(),
             'convergence_reason': reason
         })
         logger.info(f"Completed session {self.session_id}: {reason}")
@@ -169,7 +245,7 @@ class SessionManager:
         """
         self.update_session({
             'status': 'FAILED',
-            'failed_at': datetime.utcnow().isoformat(),
+            'failed_at': _utc_now(),
             'error': error
         })
         logger.error(f"Failed session {self.session_id}: {error}")
@@ -207,19 +283,45 @@ class SessionManager:
         return progress
 
 
+def _fetch_session(s3_client, session_id: str) -> Optional[tuple]:
+    """
+    Read one session.json directly.
+
+    Returns:
+        tuple of (LastModified, session dict), or None if it is missing or
+        unreadable
+    """
+    try:
+        response = s3_client.get_object(
+            Bucket=S3_BUCKET,
+            Key=f"sessions/{session_id}/session.json"
+        )
+        return response['LastModified'], _loads(response['Body'].read())
+    except Exception:
+        return None
+
+
 def list_sessions(max_sessions: int = 10) -> list:
     """
-    List recent optimization sessions.
+    List recently active optimization sessions.
+
+    Session prefixes are listed with a delimiter (one entry per session, not
+    per object), then every session.json is fetched concurrently, one GET
+    each. Sessions are ranked by the LastModified time of that GET, so the
+    most recently updated come first.
 
     Args:
         max_sessions: Maximum number of sessions to return
 
     Returns:
-        list of session metadata dicts
+        list of session metadata dicts, most recently updated first
     """
+    import heapq
+    from concurrent.futures import ThreadPoolExecutor
+
     try:
         s3_client = get_s3_client()
-        # List all session.json files
+        # List all session directories
         paginator = s3_client.get_paginator('list_objects_v2')
         pages = paginator.paginate(
             Bucket=S3_BUCKET,
@@ -227,40 +329,42 @@ def list_sessions(max_sessions: int = 10) -> list:
             Delimiter='/'
         )
 
-        sessions = []
-
-        for page in pages:
-            # Get session directories
-            if 'CommonPrefixes' not in page:
-                continue
-
-            for prefix in page['CommonPrefixes']:
-                session_dir = prefix['Prefix']
-                session_id = session_dir.split('/')[1]
+        session_ids = [
+            prefix['Prefix'].split('/')[1]
+            for page in pages
+            for prefix in page.get('CommonPrefixes', [])
+        ]
+        if not session_ids:
+            return []
+
+        # Workers match the client's connection pool
+        with ThreadPoolExecutor(max_workers=min(16, len(session_ids))) as executor:
+            fetched = executor.map(lambda sid: _fetch_session(s3_client, sid), session_ids)
+            newest = heapq.nlargest(
+                max_sessions,
+                (item for item in fetched if item is not None),
+                key=lambda item: item[0]
+            )
 
-                # Try to load session metadata
-                try:
-                    manager = SessionManager(session_id)
-                    session_data = manager.get_session()
-                    if session_data:
-                        sessions.append(session_data)
-                except:
-                    continue
+        return [session for _, session in newest]
 
-                if len(sessions) >= max_sessions:
-                    break
+    except Exception as e:
+        logger.error(f"Failed to list sessions: {e}")
+        return []
 
-            if len(sessions) >= max_sessions:
-                break
 
-        # Sort by creation date (most recent first)
-        sessions.sort(key=lambda s: s.get('created_at', ''), reverse=True)
+@functools.lru_cache(maxsize=8)
+def get_session_manager(session_id: str) -> SessionManager:
+    """
+    Get the SessionManager for a session, reused across warm invocations.
 
-        return sessions[:max_sessions]
+    Args:
+        session_id: Unique identifier for this optimization session
 
-    except Exception as e:
-        logger.error(f"Failed to list sessions: {e}")
-        return []
+    Returns:
+        SessionManager bound to the shared S3 client
+    """
+    return SessionManager(session_id)
 
 
 def get_active_sessions() -> list:
@@ -10,6 +10,7 @@ Designed for easy migration to S3/DynamoDB later.
 
 import os
 import csv
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List
@@ -20,6 +21,60 @@ DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
 DESIGN_HISTORY_FILE = os.path.join(DEFAULT_DATA_DIR, 'design_history.csv')
 RESULTS_FILE = os.path.join(DEFAULT_DATA_DIR, 'results.csv')
 
+# CSV columns in file order, and the header lines written for new files
+DESIGN_HISTORY_FIELDS = [
+    'timestamp',
+    'geometry_id',
+    'thickness',
+    'max_camber',
+    'camber_position',
+    'alpha',
+    'Cl',
+    'Cd',
+    'L_D',
+    'converged',
+    'reynolds',
+    'iterations',
+    'computation_time'
+]
+RESULTS_FIELDS = [
+    'timestamp',
+    'iteration',
+    'candidate_count',
+    'best_cd',
+    'best_geometry_id',
+    'strategy',
+    'trust_radius',
+    'confidence',
+    'notes'
+]
+DESIGN_HISTORY_HEADER = ','.join(DESIGN_HISTORY_FIELDS) + '\r\n'
+RESULTS_HEADER = ','.join(RESULTS_FIELDS) + '\r\n'
+
+# Columns type-converted for every row to pick the best design (only the
+# winning row is converted in full)
+BEST_DESIGN_FILTER_COLUMNS = ['Cl', 'Cd', 'converged']
+
+
+def _convert_design_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert design history columns (whichever are present) to their types."""
+    if df.empty:
+        return df
+
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if 'converged' in df.columns:
+        df['converged'] = df['converged'].astype(bool)
+
+    # Numeric columns
+    numeric_cols = ['thickness', 'max_camber', 'camber_position', 'alpha',
+                    'Cl', 'Cd', 'L_D', 'reynolds', 'iterations', 'computation_time']
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return df
+
 
 class DesignHistoryStorage:
     """
@@ -43,29 +98,14 @@ class DesignHistoryStorage:
         # Create directory if needed
         os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
 
-        # Create file with headers if it doesn't exist
-        if not os.path.exists(self.filepath):
-            headers = [
-                'timestamp',
-                'geometry_id',
-                'thickness',
-                'max_camber',
-                'camber_position',
-                'alpha',
-                'Cl',
-                'Cd',
-                'L_D',
-                'converged',
-                'reynolds',
-                'iterations',
-                'computation_time'
-            ]
-
-            with open(self.filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-
-            print(f"Created design_history.csv at {self.filepath}")
+        # Create file with headers if it doesn't exist ('x' fails if it does)
+        try:
+            with open(self.filepath, 'x', newline='') as f:
+                f.write(DESIGN_HISTORY_HEADER)
+        except FileExistsError:
+            return
+
+        print(f"Created design_history.csv at {self.filepath}")
 
     def write_design(self, data: Dict):
         """
@@ -78,25 +118,8 @@ class DesignHistoryStorage:
         if 'timestamp' not in data:
             data['timestamp'] = datetime.utcnow().isoformat()
 
-        # Expected fields in order
-        fields = [
-            'timestamp',
-            'geometry_id',
-            'thickness',
-            'max_camber',
-            'camber_position',
-            'alpha',
-            'Cl',
-            'Cd',
-            'L_D',
-            'converged',
-            'reynolds',
-            'iterations',
-            'computation_time'
-        ]
-
         # Extract values in correct order
-        row = [data.get(field, '') for field in fields]
+        row = [data.get(field, '') for field in DESIGN_HISTORY_FIELDS]
 
         # Append to file
         with open(self.filepath, 'a', newline='') as f:
@@ -105,29 +128,38 @@ class DesignHistoryStorage:
 
         print(f"Wrote design {data.get('geometry_id')} to history")
 
-    def read_design_history(self) -> pd.DataFrame:
+    def write_designs(self, designs: List[Dict]):
         """
-        Read entire design history as DataFrame.
+        Append several design evaluations to the history in one file write.
 
-        Returns:
-            pandas DataFrame with all design evaluations
+        Args:
+            designs: List of dicts with keys matching CSV headers
         """
-        try:
-            df = pd.read_csv(self.filepath)
+        for data in designs:
+            # Ensure timestamp exists
+            if 'timestamp' not in data:
+                data['timestamp'] = datetime.utcnow().isoformat()
 
-            # Convert data types
-            if not df.empty:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df['converged'] = df['converged'].astype(bool)
+        rows = [[data.get(field, '') for field in DESIGN_HISTORY_FIELDS] for data in designs]
 
-                # Numeric columns
-                numeric_cols = ['thickness', 'max_camber', 'camber_position', 'alpha',
-                                'Cl', 'Cd', 'L_D', 'reynolds', 'iterations', 'computation_time']
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Append to file
+        with open(self.filepath, 'a', newline='') as f:
+            csv.writer(f).writerows(rows)
 
-            return df
+        print(f"Wrote {len(rows)} designs to history")
+
+    def read_design_history(self, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Read design history as DataFrame.
+
+        Args:
+            columns: Only parse these columns (optional, default all)
+
+        Returns:
+            pandas DataFrame with all design evaluations
+        """
+        try:
+            return _convert_design_dtypes(pd.read_csv(self.filepath, usecols=columns))
         except Exception as e:
             print(f"Error reading design history: {e}")
             return pd.DataFrame()
@@ -157,22 +189,34 @@ class DesignHistoryStorage:
         Returns:
             dict with best design parameters and results, or None
         """
-        df = self.read_design_history()
+        try:
+            df = pd.read_csv(self.filepath)
+        except Exception as e:
+            print(f"Error reading design history: {e}")
+            return None
 
         if df.empty:
             return None
 
-        # Filter for converged designs that meet constraint
-        feasible = df[(df['converged'] == True) & (df['Cl'] >= constraint_cl_min)]
+        # Only the filter columns are type-converted for the whole history
+        filters = _convert_design_dtypes(df[BEST_DESIGN_FILTER_COLUMNS].copy())
 
-        if feasible.empty:
-            return None
+        # Mask converged designs that meet the constraint and have a Cd,
+        # without materializing a filtered copy of the DataFrame
+        cd = filters['Cd'].to_numpy(dtype=float)
+        feasible = (
+            filters['converged'].to_numpy(dtype=bool)
+            & (filters['Cl'].to_numpy(dtype=float) >= constraint_cl_min)
+            & ~np.isnan(cd)
+        )
 
-        # Find design with minimum Cd
-        best_idx = feasible['Cd'].idxmin()
-        best_row = feasible.loc[best_idx]
+        if not feasible.any():
+            return None
 
-        return best_row.to_dict()
+        # Find design with minimum Cd and convert just that row
+        best_i = int(np.where(feasible, cd, np.inf).argmin())
+        row = _convert_design_dtypes(df.iloc[[best_i]].copy())
+        return row.iloc[0].to_dict()
 
 
 class ResultsStorage:
@@ -197,25 +241,14 @@ class ResultsStorage:
         # Create directory if needed
         os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
 
-        # Create file with headers if it doesn't exist
-        if not os.path.exists(self.filepath):
-            headers = [
-                'timestamp',
-                'iteration',
-                'candidate_count',
-                'best_cd',
-                'best_geometry_id',
-                'strategy',
-                'trust_radius',
-                'confidence',
-                'notes'
-            ]
-
-            with open(self.filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-
-            print(f"Created results.csv at {self.filepath}")
+        # Create file with headers if it doesn't exist ('x' fails if it does)
+        try:
+            with open(self.filepath, 'x', newline='') as f:
+                f.write(RESULTS_HEADER)
+        except FileExistsError:
+            return
+
+        print(f"Created results.csv at {self.filepath}")
 
     def write_result(self, data: Dict):
         """
@@ -228,21 +261,8 @@ class ResultsStorage:
         if 'timestamp' not in data:
             data['timestamp'] = datetime.utcnow().isoformat()
 
-        # Expected fields in order
-        fields = [
-            'timestamp',
-            'iteration',
-            'candidate_count',
-            'best_cd',
-            'best_geometry_id',
-            'strategy',
-            'trust_radius',
-            'confidence',
-            'notes'
-        ]
-
         # Extract values in correct order
-        row = [data.get(field, '') for field in fields]
+        row = [data.get(field, '') for field in RESULTS_FIELDS]
 
         # Append to file
         with open(self.filepath, 'a', newline='') as f:
@@ -317,9 +337,11 @@ class ResultsStorage:
 def clear_all_data():
     """Clear all CSV files (useful for testing)."""
     for filepath in [DESIGN_HISTORY_FILE, RESULTS_FILE]:
-        if os.path.exists(filepath):
+        try:
             os.remove(filepath)
-            print(f"Cleared {filepath}")
+        except FileNotFoundError:
+            continue
+        print(f"Cleared {filepath}")
 
 
 def get_optimization_summary() -> Dict:
@@ -5,30 +5,139 @@ Replaces local CSV storage with S3 for production use.
 Maintains same interface as storage.py for easy migration.
 """
 
-import json
-import boto3
+import functools
+import heapq
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from json_codec import dumps_bytes as _dumps_object, loads as _loads
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Get S3 bucket from environment
 S3_BUCKET = os.environ.get('S3_BUCKET', 'cfd-optimization-data-120569639479-us-east-1')
 
-# Lazy initialization of boto3 client
-_s3_client = None
+
+# HTTP connection pool size; keep it at or above READ_CONCURRENCY so
+# concurrent GETs don't queue on "Connection pool is full"
+S3_MAX_POOL = int(os.environ.get('S3_MAX_POOL', '32'))
 
 
+@functools.cache
 def get_s3_client():
-    """Get or create S3 client (lazy initialization)."""
-    global _s3_client
-    if _s3_client is None:
-        import boto3
-        _s3_client = boto3.client('s3')
-    return _s3_client
+    """Get or create S3 client (lazy initialization, cached per container)."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client('s3', config=Config(
+        max_pool_connections=S3_MAX_POOL,
+        retries={'max_attempts': 3, 'mode': 'standard'}
+    ))
+
+
+# Parsed objects keyed by S3 key -> (ETag, data). Survives warm invocations, so
+# a re-read only fetches objects that were added or rewritten since last time.
+_OBJECT_CACHE = {}
+_OBJECT_CACHE_MAX = 2048
+
+
+def _read_json_cached(s3_client, bucket: str, obj: Dict) -> Dict:
+    """
+    Read a JSON object, reusing the cached parse if its ETag is unchanged.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Bucket name
+        obj: Entry from a list_objects_v2 'Contents' page
+
+    Returns:
+        Parsed JSON dict
+    """
+    key = obj['Key']
+    etag = obj.get('ETag')
+
+    cached = _OBJECT_CACHE.get(key)
+    if cached is not None and etag is not None and cached[0] == etag:
+        return cached[1]
+
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    data = _loads(response['Body'].read())
+
+    if len(_OBJECT_CACHE) >= _OBJECT_CACHE_MAX:
+        _OBJECT_CACHE.clear()
+    _OBJECT_CACHE[key] = (etag, data)
+
+    return data
+
+
+# Default number of concurrent requests when reading or writing a batch of
+# a session's objects
+READ_CONCURRENCY = 16
+
+
+def _read_json_objects(s3_client, bucket: str, objects: List[Dict],
+                       concurrency: int = READ_CONCURRENCY) -> List[Dict]:
+    """
+    Read many JSON objects concurrently, preserving the order of objects.
+
+    Objects that fail to read are logged and skipped.
+
+    Args:
+        s3_client: boto3 S3 client (shared across worker threads)
+        bucket: Bucket name
+        objects: Entries from list_objects_v2 'Contents' pages
+        concurrency: Maximum number of GETs in flight
+
+    Returns:
+        List of parsed JSON dicts (copies, safe to mutate)
+    """
+    def read_one(obj):
+        try:
+            return dict(_read_json_cached(s3_client, bucket, obj))
+        except Exception as e:
+            logger.warning(f"Skipping unreadable object {obj['Key']}: {e}")
+            return None
+
+    if len(objects) <= 1 or concurrency <= 1:
+        fetched = map(read_one, objects)
+        return [data for data in fetched if data is not None]
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(objects))) as executor:
+        fetched = executor.map(read_one, objects)
+        return [data for data in fetched if data is not None]
+
+
+def find_best_design(designs: List[Dict], constraint_cl_min: float = 0.30) -> Optional[Dict]:
+    """
+    Find the best design (lowest Cd) that satisfies constraints.
+
+    Works on designs already read into memory, so callers that hold the
+    design list don't trigger a second S3 scan.
+
+    Args:
+        designs: List of design dicts
+        constraint_cl_min: Minimum Cl requirement
+
+    Returns:
+        dict with best design, or None
+    """
+    best = None
+    best_cd = float('inf')
+
+    for d in designs:
+        # Only converged designs that meet the constraint are feasible
+        if not d.get('converged', False) or d.get('Cl', 0) < constraint_cl_min:
+            continue
+        cd = d.get('Cd', float('inf'))
+        if best is None or cd < best_cd:
+            best = d
+            best_cd = cd
+
+    return best
 
 
 class S3DesignHistoryStorage:
@@ -39,15 +148,17 @@ class S3DesignHistoryStorage:
     s3://bucket/sessions/{session_id}/designs/{geometry_id}.json
     """
 
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, s3_client=None):
         """
         Initialize S3 storage adapter.
 
         Args:
             session_id: Unique identifier for this optimization session
+            s3_client: boto3 S3 client to use (defaults to the shared client)
         """
         self.session_id = session_id
         self.bucket = S3_BUCKET
+        self.s3_client = s3_client or get_s3_client()
         self.prefix = f"sessions/{session_id}/designs/"
 
         logger.info(f"Initialized S3 storage for session {session_id}")
@@ -69,11 +180,11 @@ class S3DesignHistoryStorage:
         key = f"{self.prefix}{geometry_id}_{timestamp}.json"
 
         try:
-            s3_client = get_s3_client()
+            s3_client = self.s3_client
             s3_client.put_object(
                 Bucket=self.bucket,
                 Key=key,
-                Body=json.dumps(data, indent=2),
+                Body=_dumps_object(data),
                 ContentType='application/json'
             )
             logger.info(f"Wrote design {geometry_id} to S3: {key}")
@@ -81,37 +192,56 @@ class S3DesignHistoryStorage:
             logger.error(f"Failed to write design to S3: {e}")
             raise
 
-    def read_all_designs(self) -> List[Dict]:
+    def write_designs(self, designs: List[Dict], concurrency: int = READ_CONCURRENCY):
+        """
+        Write several design evaluations to S3 concurrently.
+
+        Each design still gets its own object (as with write_design), so
+        readers are unaffected; only the PUTs overlap.
+
+        Args:
+            designs: List of dicts with design parameters and CFD results
+            concurrency: Maximum number of PUTs in flight
+
+        Raises:
+            The first write failure, after every write has finished
+        """
+        if len(designs) <= 1 or concurrency <= 1:
+            for data in designs:
+                self.write_design(data)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(designs))) as executor:
+            futures = [executor.submit(self.write_design, data) for data in designs]
+        for future in futures:
+            future.result()
+
+    def read_all_designs(self, concurrency: int = READ_CONCURRENCY) -> List[Dict]:
         """
         Read all design evaluations for this session from S3.
 
+        Keys are listed first, then the objects are fetched concurrently.
+
+        Args:
+            concurrency: Maximum number of GETs in flight
+
         Returns:
             List of design dicts
         """
-        designs = []
-
         try:
-            s3_client = get_s3_client()
-            # List all objects with this prefix
+            s3_client = self.s3_client
+            # List all objects with this prefix, skipping directories
             paginator = s3_client.get_paginator('list_objects_v2')
             pages = paginator.paginate(Bucket=self.bucket, Prefix=self.prefix)
+            objects = [
+                obj
+                for page in pages
+                for obj in page.get('Contents', [])
+                if not obj['Key'].endswith('/')
+            ]
 
-            for page in pages:
-                if 'Contents' not in page:
-                    continue
-
-                for obj in page['Contents']:
-                    key = obj['Key']
-
-                    # Skip directories
-                    if key.endswith('/'):
-                        continue
-
-                    # Read the design data
-                    s3_client = get_s3_client()
-                    response = s3_client.get_object(Bucket=self.bucket, Key=key)
-                    data = json.loads(response['Body'].read())
-                    designs.append(data)
+            # Read the design data (unchanged objects come from cache)
+            designs = _read_json_objects(s3_client, self.bucket, objects, concurrency)
 
             logger.info(f"Read {len(designs)} designs from S3")
             return designs
@@ -130,43 +260,118 @@ class S3DesignHistoryStorage:
         Returns:
             dict with best design, or None
         """
-        designs = self.read_all_designs()
+        return find_best_design(self.read_all_designs(), constraint_cl_min)
+
+    def read_best_summary(self) -> Optional[Dict]:
+        """
+        Read the best-so-far summary maintained by run_cfd.
+
+        A single small GET at sessions/{session_id}/best.json, as opposed to
+        get_best_design() which scans every design.
+
+        Returns:
+            dict with the best design's parameters and results, or None
+        """
+        key = f"sessions/{self.session_id}/best.json"
+        s3_client = self.s3_client
 
-        if not designs:
+        try:
+            response = s3_client.get_object(Bucket=self.bucket, Key=key)
+            return _loads(response['Body'].read())
+        except s3_client.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read best design summary from S3: {e}")
             return None
 
-        # Filter for converged designs that meet constraint
-        feasible = [
-            d for d in designs
-            if d.get('converged', False) and d.get('Cl', 0) >= constraint_cl_min
-        ]
+    def compact_history(self) -> Optional[str]:
+        """
+        Concatenate run_cfd's per-evaluation history shards into one CSV.
 
-        if not feasible:
+        Shards live under sessions/{session_id}/history/, each holding the
+        header and one row; they are fetched concurrently and joined in key
+        (iteration) order into sessions/{session_id}/design_history.csv.
+        Meant for end-of-run callers such as generate_report, not the
+        per-evaluation path.
+
+        Returns:
+            Key of the written CSV, or None if there were no shards
+        """
+        s3_client = self.s3_client
+        history_prefix = f"sessions/{self.session_id}/history/"
+
+        paginator = s3_client.get_paginator('list_objects_v2')
+        keys = sorted(
+            obj['Key']
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=history_prefix)
+            for obj in page.get('Contents', [])
+            if not obj['Key'].endswith('/')
+        )
+        if not keys:
             return None
 
-        # Find design with minimum Cd
-        best = min(feasible, key=lambda d: d.get('Cd', float('inf')))
-        return best
+        def read_body(key):
+            return s3_client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+        # Shards are fetched concurrently; map() keeps them in key order and
+        # re-raises the first failure so a partial CSV is never written
+        with ThreadPoolExecutor(max_workers=min(READ_CONCURRENCY, len(keys))) as executor:
+            bodies = list(executor.map(read_body, keys))
+
+        header = None
+        rows = []
+        for body in bodies:
+            shard_header, _, shard_rows = body.partition(b'\n')
+            header = header or shard_header + b'\n'
+            rows.append(shard_rows)
+
+        csv_key = f"sessions/{self.session_id}/design_history.csv"
+        s3_client.put_object(
+            Bucket=self.bucket,
+            Key=csv_key,
+            Body=header + b''.join(rows),
+            ContentType='text/csv'
+        )
+        logger.info(f"Compacted {len(keys)} history rows into {csv_key}")
+        return csv_key
 
     def get_latest_designs(self, n: int = 10) -> List[Dict]:
         """
         Get the n most recent design evaluations.
 
+        Objects are ranked by the LastModified time in the listing, so only
+        the n newest are fetched rather than every design in the session.
+
         Args:
             n: Number of recent designs to retrieve
 
         Returns:
             List of design dicts
         """
-        designs = self.read_all_designs()
-
-        if not designs:
+        try:
+            s3_client = self.s3_client
+            paginator = s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(Bucket=self.bucket, Prefix=self.prefix)
+            newest = heapq.nlargest(
+                n,
+                (
+                    obj
+                    for page in pages
+                    for obj in page.get('Contents', [])
+                    if not obj['Key'].endswith('/')
+                ),
+                key=lambda o: o['LastModified']
+            )
+        except Exception as e:
+            logger.error(f"Failed to list designs in S3: {e}")
             return []
 
+        designs = _read_json_objects(s3_client, self.bucket, newest)
+
         # Sort by timestamp (most recent first)
         designs.sort(key=lambda d: d.get('timestamp', ''), reverse=True)
 
-        return designs[:n]
+        return designs
 
 
 class S3ResultsStorage:
@@ -177,15 +382,17 @@ class S3ResultsStorage:
     s3://bucket/sessions/{session_id}/iterations/{iteration}.json
     """
 
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, s3_client=None):
         """
         Initialize S3 storage adapter.
 
         Args:
             session_id: Unique identifier for this optimization session
+            s3_client: boto3 S3 client to use (defaults to the shared client)
         """
         self.session_id = session_id
         self.bucket = S3_BUCKET
+        self.s3_client = s3_client or get_s3_client()
         self.prefix = f"sessions/{session_id}/iterations/"
 
         logger.info(f"Initialized S3 results storage for session {session_id}")
@@ -206,11 +413,11 @@ class S3ResultsStorage:
         key = f"{self.prefix}iteration_{iteration:03d}.json"
 
         try:
-            s3_client = get_s3_client()
+            s3_client = self.s3_client
             s3_client.put_object(
                 Bucket=self.bucket,
                 Key=key,
-                Body=json.dumps(data, indent=2),
+                Body=_dumps_object(data),
                 ContentType='application/json'
             )
             logger.info(f"Wrote iteration {iteration} to S3: {key}")
@@ -218,37 +425,32 @@ class S3ResultsStorage:
             logger.error(f"Failed to write result to S3: {e}")
             raise
 
-    def read_all_results(self) -> List[Dict]:
+    def read_all_results(self, concurrency: int = READ_CONCURRENCY) -> List[Dict]:
         """
         Read all iteration results for this session from S3.
 
+        Keys are listed first, then the objects are fetched concurrently.
+
+        Args:
+            concurrency: Maximum number of GETs in flight
+
         Returns:
             List of iteration result dicts
         """
-        results = []
-
         try:
-            s3_client = get_s3_client()
-            # List all objects with this prefix
+            s3_client = self.s3_client
+            # List all objects with this prefix, skipping directories
             paginator = s3_client.get_paginator('list_objects_v2')
             pages = paginator.paginate(Bucket=self.bucket, Prefix=self.prefix)
+            objects = [
+                obj
+                for page in pages
+                for obj in page.get('Contents', [])
+                if not obj['Key'].endswith('/')
+            ]
 
-            for page in pages:
-                if 'Contents' not in page:
-                    continue
-
-                for obj in page['Contents']:
-                    key = obj['Key']
-
-                    # Skip directories
-                    if key.endswith('/'):
-                        continue
-
-                    # Read the result data
-                    s3_client = get_s3_client()
-                    response = s3_client.get_object(Bucket=self.bucket, Key=key)
-                    data = json.loads(response['Body'].read())
-                    results.append(data)
+            # Read the result data (unchanged objects come from cache)
+            results = _read_json_objects(s3_client, self.bucket, objects, concurrency)
 
             # Sort by iteration number
             results.sort(key=lambda r: r.get('iteration', 0))
@@ -260,6 +462,52 @@ class S3ResultsStorage:
             logger.error(f"Failed to read results from S3: {e}")
             return []
 
+    def _iteration_from_key(self, key: str) -> int:
+        """Iteration number from a key written by write_result (0 if it has none)."""
+        name = key[len(self.prefix):].removeprefix('iteration_').removesuffix('.json')
+        try:
+            return int(name)
+        except ValueError:
+            return 0
+
+    def read_first_and_last_results(self) -> tuple:
+        """
+        Read only the first and last iteration results for this session.
+
+        Lists the iteration keys, picks the endpoints by the iteration number
+        in each key and fetches just those two objects.
+
+        Returns:
+            tuple: (iteration count, first result or None, last result or None)
+        """
+        try:
+            s3_client = self.s3_client
+            paginator = s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(Bucket=self.bucket, Prefix=self.prefix)
+
+            objects = [
+                obj
+                for page in pages
+                for obj in page.get('Contents', [])
+                if not obj['Key'].endswith('/')
+            ]
+
+            if not objects:
+                return 0, None, None
+
+            # Compare numerically: the zero padding stops at three digits
+            first_obj = min(objects, key=lambda o: self._iteration_from_key(o['Key']))
+            last_obj = max(objects, key=lambda o: self._iteration_from_key(o['Key']))
+            first = dict(_read_json_cached(s3_client, self.bucket, first_obj))
+            last = dict(_read_json_cached(s3_client, self.bucket, last_obj))
+
+            logger.info(f"Read first/last of {len(objects)} iteration results from S3")
+            return len(objects), first, last
+
+        except Exception as e:
+            logger.error(f"Failed to read results from S3: {e}")
+            return 0, None, None
+
     def get_latest_iteration(self) -> Optional[Dict]:
         """
         Get the most recent iteration result.
@@ -282,34 +530,72 @@ class S3ResultsStorage:
         Returns:
             float: Improvement percentage, or None if insufficient data
         """
-        results = self.read_all_results()
+        return _improvement_pct(self.read_all_results())
 
-        if len(results) < 2:
-            return None
 
-        last_two = results[-2:]
-        cd_prev = last_two[0].get('best_cd')
-        cd_current = last_two[1].get('best_cd')
+def _improvement_pct(results: List[Dict]) -> Optional[float]:
+    """
+    Improvement percentage between the last two of iteration-sorted results.
 
-        if cd_prev is None or cd_current is None or cd_prev == 0:
-            return None
+    Returns:
+        float rounded to 2 decimals, or None if insufficient data
+    """
+    if len(results) < 2:
+        return None
+
+    cd_prev = results[-2].get('best_cd')
+    cd_current = results[-1].get('best_cd')
 
-        improvement_pct = (cd_prev - cd_current) / cd_prev * 100
-        return round(improvement_pct, 2)
+    if cd_prev is None or cd_current is None or cd_prev == 0:
+        return None
+
+    improvement_pct = (cd_prev - cd_current) / cd_prev * 100
+    return round(improvement_pct, 2)
+
+
+@functools.lru_cache(maxsize=8)
+def get_design_storage(session_id: str) -> S3DesignHistoryStorage:
+    """
+    Get the design storage for a session, reused across warm invocations.
+
+    Args:
+        session_id: Unique identifier for this optimization session
+
+    Returns:
+        S3DesignHistoryStorage bound to the shared S3 client
+    """
+    return S3DesignHistoryStorage(session_id)
+
+
+@functools.lru_cache(maxsize=8)
+def get_results_storage(session_id: str) -> S3ResultsStorage:
+    """
+    Get the results storage for a session, reused across warm invocations.
+
+    Args:
+        session_id: Unique identifier for this optimization session
+
+    Returns:
+        S3ResultsStorage bound to the shared S3 client
+    """
+    return S3ResultsStorage(session_id)
 
 
 def get_optimization_summary(session_id: str) -> Dict:
     """
     Get a summary of the current optimization state from S3.
 
+    Designs and results are each scanned once; the best design, latest
+    iteration and improvement are all derived from those lists.
+
     Args:
         session_id: Unique identifier for this optimization session
 
     Returns:
         dict with summary statistics
     """
-    design_storage = S3DesignHistoryStorage(session_id)
-    results_storage = S3ResultsStorage(session_id)
+    design_storage = get_design_storage(session_id)
+    results_storage = get_results_storage(session_id)
 
     designs = design_storage.read_all_designs()
     results = results_storage.read_all_results()
@@ -318,9 +604,9 @@ def get_optimization_summary(session_id: str) -> Dict:
         'session_id': session_id,
         'total_designs_evaluated': len(designs),
         'total_iterations': len(results),
-        'best_design': design_storage.get_best_design(),
-        'latest_iteration': results_storage.get_latest_iteration(),
-        'improvement_pct': results_storage.calculate_improvement()
+        'best_design': find_best_design(designs),
+        'latest_iteration': results[-1] if results else None,
+        'improvement_pct': _improvement_pct(results)
     }
 
     return summary
\ No newline at end of file
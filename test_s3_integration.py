@@ -274,7 +274,7 @@ def verify_s3_structure(session_id):
         f"sessions/{session_id}/",
         f"sessions/{session_id}/session.json",
         f"sessions/{session_id}/designs/",
-        f"sessions/{session_id}/design_history.csv",
+        f"sessions/{session_id}/history/",
         f"sessions/{session_id}/iterations/"
     ]
 
@@ -0,0 +1,54 @@
+"""
+Test the Bedrock Agent response envelopes in
+lambdas/shared/python/agent_response.py.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+import agent_response  # noqa: E402
+
+EVENT = {'actionGroup': 'get-next-candidates', 'apiPath': '/get_next_candidates', 'httpMethod': 'POST'}
+
+
+def test_success_response():
+    response = agent_response.create_success_response(EVENT, {'candidates': [1, 2]})
+
+    assert response == {
+        'messageVersion': '1.0',
+        'response': {
+            'actionGroup': 'get-next-candidates',
+            'apiPath': '/get_next_candidates',
+            'httpMethod': 'POST',
+            'httpStatusCode': 200,
+            'responseBody': {'application/json': {'body': json.dumps({'candidates': [1, 2]},
+                                                                     separators=(',', ':'))}}
+        }
+    }
+
+
+def test_error_response():
+    response = agent_response.create_error_response({}, 'boom')['response']
+
+    assert response['httpStatusCode'] == 500
+    assert response['actionGroup'] == ''
+    assert json.loads(response['responseBody']['application/json']['body']) == {'error': 'boom'}
+
+
+def test_templates_are_not_mutated():
+    agent_response.create_success_response(EVENT, {'a': 1})
+    agent_response.create_error_response(EVENT, 'boom')
+
+    assert agent_response._SUCCESS_TEMPLATE['response']['actionGroup'] == ''
+    assert agent_response._SUCCESS_TEMPLATE['response']['responseBody'] is None
+    assert agent_response._ERROR_TEMPLATE['response']['httpStatusCode'] == 500
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,142 @@
+"""
+Test the check_convergence handler's local results.csv backend.
+"""
+
+import builtins
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+HEADER = "timestamp,iteration,candidate_count,best_cd,best_geometry_id,strategy,trust_radius,confidence,notes\r\n"
+
+
+@pytest.fixture
+def handler(monkeypatch, tmp_path):
+    """check_convergence loaded with the CSV backend and a cold tail cache."""
+    monkeypatch.setenv('CONVERGENCE_BACKEND', 'csv')
+    monkeypatch.setenv('RESULTS_CSV_PATH', str(tmp_path / 'results.csv'))
+    spec = importlib.util.spec_from_file_location(
+        'check_convergence_handler',
+        os.path.join(ROOT, 'lambdas', 'check_convergence', 'handler.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _row(iteration, best_cd, notes='ok'):
+    return (f"2026-01-01T00:00:0{iteration % 10},{iteration},3,{best_cd},"
+            f"NACA44{iteration:02d}_a2.0,exploit,0.01,0.8,{notes}\r\n")
+
+
+def _append(path, text):
+    with open(path, 'a', newline='') as f:
+        f.write(text)
+
+
+def _count_opens(monkeypatch, handler):
+    opens = []
+
+    def counting_open(*args, **kwargs):
+        opens.append(args[0])
+        return builtins.open(*args, **kwargs)
+
+    monkeypatch.setattr(handler, 'open', counting_open, raising=False)
+    return opens
+
+
+def test_missing_file(handler, tmp_path):
+    assert handler._read_results_csv(str(tmp_path / 'missing.csv')) == (0, [])
+
+
+def test_reads_count_and_last_two_rows(handler):
+    path = handler.RESULTS_CSV_PATH
+    _append(path, HEADER + _row(1, 0.020) + _row(2, 0.018) + _row(3, 'n/a'))
+
+    count, last_two = handler._read_results_csv(path)
+
+    assert count == 3
+    assert [r['iteration'] for r in last_two] == ['2', '3']
+    assert last_two[0]['best_cd'] == 0.018
+    assert last_two[1]['best_cd'] is None
+
+
+def test_unchanged_file_is_not_reopened(handler, monkeypatch):
+    path = handler.RESULTS_CSV_PATH
+    _append(path, HEADER + _row(1, 0.020) + _row(2, 0.018))
+    first = handler._read_results_csv(path)
+
+    opens = _count_opens(monkeypatch, handler)
+    assert handler._read_results_csv(path) == first
+    assert opens == []
+
+
+def test_only_appended_rows_are_parsed(handler, monkeypatch):
+    path = handler.RESULTS_CSV_PATH
+    _append(path, HEADER + _row(1, 0.020) + _row(2, 0.018))
+    handler._read_results_csv(path)
+    size_before = os.path.getsize(path)
+
+    _append(path, _row(3, 0.017) + _row(4, 0.0169))
+    count, last_two = handler._read_results_csv(path)
+
+    assert count == 4
+    assert [r['best_cd'] for r in last_two] == [0.017, 0.0169]
+    assert handler._TAIL_CACHE['size'] == os.path.getsize(path) > size_before
+    assert len(handler._TAIL_CACHE['rows']) == 2
+
+
+def test_partial_last_line_is_read_later(handler):
+    path = handler.RESULTS_CSV_PATH
+    row = _row(2, 0.018)
+    _append(path, HEADER + _row(1, 0.020) + row[:10])
+
+    assert handler._read_results_csv(path)[0] == 1
+
+    _append(path, row[10:])
+    count, last_two = handler._read_results_csv(path)
+    assert count == 2
+    assert last_two[-1]['best_cd'] == 0.018
+
+
+def test_rewritten_file_is_read_from_start(handler):
+    path = handler.RESULTS_CSV_PATH
+    _append(path, HEADER + _row(1, 0.020) + _row(2, 0.018) + _row(3, 0.017))
+    handler._read_results_csv(path)
+
+    # clear_all_data() recreates the file with just the header
+    with open(path, 'w', newline='') as f:
+        f.write(HEADER + _row(1, 0.030))
+
+    count, last_two = handler._read_results_csv(path)
+    assert count == 1
+    assert last_two[0]['best_cd'] == 0.030
+
+
+def test_quoted_newline_in_notes(handler):
+    path = handler.RESULTS_CSV_PATH
+    _append(path, HEADER + _row(1, 0.020, notes='"two\r\nlines"') + _row(2, 0.018))
+
+    count, last_two = handler._read_results_csv(path)
+    assert count == 2
+    assert last_two[0]['notes'] == 'two\r\nlines'
+
+
+def test_handler_uses_csv_backend(handler):
+    _append(handler.RESULTS_CSV_PATH, HEADER + _row(1, 0.0200) + _row(2, 0.01999))
+
+    response = handler.lambda_handler({'max_iter': 8, 'iteration': 2}, None)
+
+    assert response['converged'] is True
+    assert response['iteration'] == 2
+    assert response['best_cd'] == 0.01999
+    assert response['improvement_pct'] == 0.05
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,37 @@
+"""
+Test the generate_geometry handler helpers.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+_spec = importlib.util.spec_from_file_location(
+    'generate_geometry_handler',
+    os.path.join(ROOT, 'lambdas', 'generate_geometry', 'handler.py')
+)
+handler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(handler)
+
+
+def test_geometry_id():
+    assert handler.generate_geometry_id(0.12, 0.04, 0.4, 2.5) == 'NACA4412_a2.5'
+    assert handler.generate_geometry_id(0.10, 0.0, 0.0, -1.0) == 'NACA0010_a-1.0'
+
+
+def test_geometry_id_cache_keeps_int_and_float_apart():
+    """2 and 2.0 share a hash but must not share a cached id."""
+    handler.generate_geometry_id.cache_clear()
+
+    assert handler.generate_geometry_id(0.12, 0.04, 0.4, 2) == 'NACA4412_a2'
+    assert handler.generate_geometry_id(0.12, 0.04, 0.4, 2.0) == 'NACA4412_a2.0'
+    assert handler.generate_geometry_id(0.12, 0.04, 0.4, 2) == 'NACA4412_a2'
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
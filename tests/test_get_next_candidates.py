@@ -0,0 +1,195 @@
+"""
+Test the get_next_candidates handler helpers.
+
+S3 is mocked with moto, so no AWS account is needed.
+"""
+
+import importlib.util
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+BUCKET = 'cfd-test-bucket'
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ['S3_BUCKET'] = BUCKET
+
+import session_manager  # noqa: E402
+import storage_s3  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location(
+    'get_next_candidates_handler',
+    os.path.join(ROOT, 'lambdas', 'get_next_candidates', 'handler.py')
+)
+handler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(handler)
+
+
+def _clear_client_caches():
+    session_manager.get_s3_client.cache_clear()
+    session_manager.get_session_manager.cache_clear()
+    storage_s3.get_s3_client.cache_clear()
+    storage_s3.get_design_storage.cache_clear()
+    storage_s3._OBJECT_CACHE.clear()
+
+
+@pytest.fixture
+def s3():
+    """Mocked bucket; the modules' cached clients are rebuilt inside the mock."""
+    with mock_aws():
+        _clear_client_caches()
+        client = boto3.client('s3')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        _clear_client_caches()
+
+
+def test_trust_region_seeds_state():
+    state = handler.update_trust_region(None, 1, 0.02, 0.01, 4)
+
+    assert state == {'radius': 0.01, 'success': 0, 'fail': 0,
+                     'best_cd': 0.02, 'iteration': 1}
+
+
+def test_trust_region_doubles_after_successes():
+    """Every _TR_SUCCESS_TOLERANCE improvements double the radius up to the cap."""
+    state = handler.update_trust_region(None, 1, 0.02, 0.01, 4)
+    radii = []
+    cd = 0.02
+    for iteration in range(2, 11):
+        cd -= 0.001
+        state = handler.update_trust_region(state, iteration, cd, 0.01, 4)
+        radii.append(state['radius'])
+
+    assert handler._TR_SUCCESS_TOLERANCE == 3
+    assert radii == [0.01, 0.01, 0.02,
+                     0.02, 0.02, handler._TR_MAX_RADIUS,
+                     handler._TR_MAX_RADIUS, handler._TR_MAX_RADIUS, handler._TR_MAX_RADIUS]
+    assert state['best_cd'] == cd
+
+
+def test_trust_region_halves_after_failures():
+    """A batch-size dependent run of non-improvements halves the radius down to the floor."""
+    num_candidates = 4
+    fail_tolerance = -(-max(4, len(handler._PARAM_SPECS)) // num_candidates)
+
+    state = handler.update_trust_region(None, 1, 0.02, 0.01, num_candidates)
+    expected = 0.01
+    for iteration in range(2, 2 + 4 * fail_tolerance):
+        state = handler.update_trust_region(state, iteration, 0.02, 0.01, num_candidates)
+        if (iteration - 1) % fail_tolerance == 0:
+            expected = max(expected / 2, handler._TR_MIN_RADIUS)
+        assert state['radius'] == expected
+
+    assert state['radius'] == handler._TR_MIN_RADIUS
+    assert state['best_cd'] == 0.02
+
+
+def test_trust_region_success_resets_failures():
+    state = handler.update_trust_region(None, 1, 0.02, 0.01, 1)
+    state = handler.update_trust_region(state, 2, 0.02, 0.01, 1)
+    assert state['fail'] == 1
+
+    state = handler.update_trust_region(state, 3, 0.019, 0.01, 1)
+    assert state['fail'] == 0
+    assert state['success'] == 1
+    assert state['radius'] == 0.01
+
+
+def test_trust_region_repeated_iteration_is_idempotent():
+    """Re-invoking for the same iteration (agent retry) must not advance the counters."""
+    state = handler.update_trust_region(None, 1, 0.02, 0.01, 4)
+    once = handler.update_trust_region(state, 2, 0.019, 0.01, 4)
+    twice = handler.update_trust_region(once, 2, 0.018, 0.01, 4)
+
+    assert twice == once
+    assert handler.update_trust_region(once, 3, None, 0.01, 4) == once
+
+
+def test_adapt_trust_radius_persists_state(s3, monkeypatch):
+    monkeypatch.setattr(handler, 'get_session_manager', session_manager.get_session_manager)
+    session_manager.SessionManager('tr').create_session({'max_iter': 10})
+
+    radii = [
+        handler.adapt_trust_radius('tr', iteration, {'Cd': cd}, 0.01, 4)
+        for iteration, cd in enumerate((0.020, 0.019, 0.018, 0.017), start=1)
+    ]
+
+    assert radii == [0.01, 0.01, 0.01, 0.02]
+    stored = session_manager.SessionManager('tr', s3_client=s3).get_session()
+    assert stored['trust_region']['radius'] == 0.02
+    assert stored['trust_region']['iteration'] == 4
+
+
+def test_parse_properties_coercion():
+    """Bedrock sends every property as a string; check they are converted."""
+    params = handler.parse_properties([
+        {'name': 'iteration_number', 'type': 'integer', 'value': '3.0'},
+        {'name': 'current_best_cd', 'type': 'number', 'value': '0.0123'},
+        {'name': 'session_id', 'type': 'string', 'value': 'abc'},
+        {'name': 'best_design', 'type': 'string', 'value': '{"thickness": 0.12}'},
+        {'name': 'extra', 'type': 'string', 'value': 'kept'},
+    ])
+
+    assert params['iteration_number'] == 3
+    assert params['current_best_cd'] == 0.0123
+    assert params['session_id'] == 'abc'
+    assert params['best_design'] == {'thickness': 0.12}
+    assert params['extra'] == 'kept'
+    # Not sent, so the schema default is used
+    assert params['constraint_cl_min'] == 0.30
+
+
+def test_parse_properties_invalid_values_keep_defaults():
+    params = handler.parse_properties([
+        {'name': 'iteration_number', 'value': 'three'},
+        {'name': 'current_best_cd', 'value': None},
+        {'name': 'best_design', 'value': '[1, 2]'},
+    ])
+
+    assert params['iteration_number'] == 1
+    assert params['current_best_cd'] == 0.015
+    assert params['best_design'] is None
+
+
+def test_optimization_strategy_phases():
+    assert handler.get_optimization_strategy(1) == ("explore", 0.015, 5)
+    assert handler.get_optimization_strategy(2) == ("explore", 0.015, 5)
+    assert handler.get_optimization_strategy(3) == ("exploit", 0.010, 4)
+    assert handler.get_optimization_strategy(5) == ("exploit", 0.010, 4)
+    assert handler.get_optimization_strategy(6) == ("refine", 0.005, 3)
+    assert handler.get_optimization_strategy(50) == ("refine", 0.005, 3)
+
+
+def test_analyze_history_prefers_best_summary(s3, monkeypatch):
+    monkeypatch.setattr(handler, 'get_design_storage', storage_s3.get_design_storage)
+    storage = storage_s3.get_design_storage('s1')
+    storage.write_design({'geometry_id': 'NACA4412_a2.0', 'Cd': 0.012, 'Cl': 0.5, 'converged': True})
+    s3.put_object(Bucket=BUCKET, Key='sessions/s1/best.json',
+                  Body=storage_s3._dumps_object({'geometry_id': 'NACA2410_a2.0', 'Cd': 0.010,
+                                                 'Cl': 0.4, 'cl_min': 0.30}))
+
+    # Summary satisfies the constraint: no history scan needed
+    assert handler.analyze_design_history_s3('s1', 0.30)['geometry_id'] == 'NACA2410_a2.0'
+    # Stricter constraint than the summary was selected under: scan the history
+    assert handler.analyze_design_history_s3('s1', 0.45)['geometry_id'] == 'NACA4412_a2.0'
+
+
+def test_analyze_history_without_summary_scans_designs(s3, monkeypatch):
+    monkeypatch.setattr(handler, 'get_design_storage', storage_s3.get_design_storage)
+    storage = storage_s3.get_design_storage('s1')
+    storage.write_design({'geometry_id': 'NACA4412_a2.0', 'Cd': 0.012, 'Cl': 0.5, 'converged': True})
+    storage.write_design({'geometry_id': 'NACA0008_a0.0', 'Cd': 0.008, 'Cl': 0.1, 'converged': True})
+
+    assert handler.analyze_design_history_s3('s1', 0.30)['geometry_id'] == 'NACA4412_a2.0'
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,61 @@
+"""
+Test the shared JSON codec in lambdas/shared/python/json_codec.py with and
+without orjson installed.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODEC_PATH = os.path.join(ROOT, 'lambdas', 'shared', 'python', 'json_codec.py')
+
+SAMPLE = {'geometry_id': 'NACA4412_a2.0', 'Cd': 0.0123, 'converged': True,
+          'notes': 'α sweep', 'history': [1, 2.5, None]}
+
+
+def _load_codec(name):
+    spec = importlib.util.spec_from_file_location(name, CODEC_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# As loaded in this environment (orjson if installed)
+DEFAULT_CODEC = _load_codec('json_codec_default')
+
+
+@pytest.fixture
+def stdlib_codec(monkeypatch):
+    """json_codec as loaded when orjson can't be imported."""
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    return _load_codec('json_codec_stdlib')
+
+
+def test_stdlib_fallback_is_used_without_orjson(stdlib_codec):
+    assert stdlib_codec.ORJSON_AVAILABLE is False
+
+
+def test_stdlib_fallback_round_trips(stdlib_codec):
+    assert isinstance(stdlib_codec.dumps(SAMPLE), str)
+    assert isinstance(stdlib_codec.dumps_bytes(SAMPLE), bytes)
+    assert isinstance(stdlib_codec.dumps_indented(SAMPLE), bytes)
+
+    assert stdlib_codec.loads(stdlib_codec.dumps(SAMPLE)) == SAMPLE
+    assert stdlib_codec.loads(stdlib_codec.dumps_bytes(SAMPLE)) == SAMPLE
+    assert stdlib_codec.loads(stdlib_codec.dumps_indented(SAMPLE)) == SAMPLE
+
+
+def test_stdlib_fallback_reads_orjson_output(stdlib_codec):
+    if not DEFAULT_CODEC.ORJSON_AVAILABLE:
+        pytest.skip("orjson is not installed")
+
+    assert stdlib_codec.loads(DEFAULT_CODEC.dumps(SAMPLE)) == SAMPLE
+    assert stdlib_codec.loads(DEFAULT_CODEC.dumps_indented(SAMPLE)) == SAMPLE
+    assert DEFAULT_CODEC.loads(stdlib_codec.dumps_indented(SAMPLE)) == SAMPLE
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,172 @@
+"""
+Test the run_cfd handler helpers.
+
+S3 is mocked with moto, so no AWS account is needed.
+"""
+
+import importlib.util
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+BUCKET = 'cfd-test-bucket'
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ['BUCKET_NAME'] = BUCKET
+
+_spec = importlib.util.spec_from_file_location(
+    'run_cfd_handler',
+    os.path.join(ROOT, 'lambdas', 'run_cfd', 'handler.py')
+)
+handler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(handler)
+
+
+@pytest.fixture
+def bucket():
+    """Empty mocked bucket and a cold best-design cache."""
+    with mock_aws():
+        boto3.client('s3').create_bucket(Bucket=BUCKET)
+        handler._BEST_CACHE.clear()
+        yield
+
+
+def _results(cd, cl, converged=True):
+    return {'Cd': cd, 'Cl': cl, 'L_D': round(cl / cd, 2), 'converged': converged}
+
+
+def _stored_best(session_id):
+    body = handler.s3.get_object(Bucket=BUCKET, Key=f"sessions/{session_id}/best.json")['Body']
+    return handler._loads(body.read())
+
+
+def test_parse_geometry_id():
+    assert handler.parse_geometry_id('NACA4412_a2.5') == {
+        'max_camber': 0.04, 'camber_position': 0.4, 'thickness': 0.12, 'alpha': 2.5
+    }
+    assert handler.parse_geometry_id('NACA2310_a-1.0')['alpha'] == -1.0
+    assert handler.parse_geometry_id('NACA0012_a1e-1')['alpha'] == 0.1
+
+
+def test_parse_geometry_id_default_alpha():
+    assert handler.parse_geometry_id('NACA2412')['alpha'] == 2.0
+
+
+@pytest.mark.parametrize('geometry_id', ['', 'naca4412', 'NACA44_a2.0', 'airfoil_1'])
+def test_parse_geometry_id_invalid(geometry_id):
+    with pytest.raises(ValueError):
+        handler.parse_geometry_id(geometry_id)
+
+
+def test_best_design_keeps_lowest_feasible_cd(bucket):
+    ts = '2026-01-01T00:00:00Z'
+    best = handler.update_best_design('s1', 'NACA4412_a2.0', _results(0.012, 0.5), ts, 0.30)
+    assert best['geometry_id'] == 'NACA4412_a2.0'
+    assert best['cl_min'] == 0.30
+
+    # Higher Cd: no change
+    best = handler.update_best_design('s1', 'NACA2412_a2.0', _results(0.015, 0.5), ts, 0.30)
+    assert best['geometry_id'] == 'NACA4412_a2.0'
+
+    # Lower Cd but below the lift constraint, or not converged: infeasible
+    handler.update_best_design('s1', 'NACA0008_a0.0', _results(0.008, 0.1), ts, 0.30)
+    handler.update_best_design('s1', 'NACA0010_a2.0', _results(0.009, 0.5, converged=False), ts, 0.30)
+    assert _stored_best('s1')['geometry_id'] == 'NACA4412_a2.0'
+
+    best = handler.update_best_design('s1', 'NACA2410_a2.0', _results(0.010, 0.4), ts, 0.30)
+    assert best['geometry_id'] == 'NACA2410_a2.0'
+    assert _stored_best('s1') == best
+
+
+def test_best_design_infeasible_first_design_is_not_stored(bucket):
+    ts = '2026-01-01T00:00:00Z'
+    assert handler.update_best_design('s1', 'NACA0008_a0.0', _results(0.008, 0.1), ts, 0.30) is None
+    assert handler._read_best('sessions/s1/best.json') == (None, None)
+
+
+def test_best_design_ignores_stale_cache(bucket):
+    """Another container's better record in S3 wins over this container's cache."""
+    ts = '2026-01-01T00:00:00Z'
+    handler.update_best_design('s2', 'NACA4412_a2.0', _results(0.012, 0.5), ts, 0.30)
+
+    other = dict(_stored_best('s2'), geometry_id='NACA2410_a2.0', Cd=0.009)
+    handler.s3.put_object(Bucket=BUCKET, Key='sessions/s2/best.json',
+                          Body=handler._dumps_object(other))
+
+    best = handler.update_best_design('s2', 'NACA2412_a2.0', _results(0.011, 0.5), ts, 0.30)
+    assert best['geometry_id'] == 'NACA2410_a2.0'
+    assert _stored_best('s2')['geometry_id'] == 'NACA2410_a2.0'
+
+
+def test_best_design_cache_skips_get_without_refresh(bucket, monkeypatch):
+    ts = '2026-01-01T00:00:00Z'
+    handler.update_best_design('s3', 'NACA4412_a2.0', _results(0.012, 0.5), ts, 0.30)
+
+    reads = []
+    read_best = handler._read_best
+    monkeypatch.setattr(handler, '_read_best', lambda key: reads.append(key) or read_best(key))
+
+    # Can't beat the cached best: answered from the cache
+    best = handler.update_best_design('s3', 'NACA2412_a2.0', _results(0.015, 0.5), ts, 0.30,
+                                      refresh=False)
+    assert best['geometry_id'] == 'NACA4412_a2.0'
+    assert reads == []
+
+    # Might be an improvement: always decided against the stored record
+    handler.update_best_design('s3', 'NACA2410_a2.0', _results(0.010, 0.5), ts, 0.30,
+                               refresh=False)
+    assert reads == ['sessions/s3/best.json']
+    assert _stored_best('s3')['geometry_id'] == 'NACA2410_a2.0'
+
+
+def test_best_design_lost_race_rereads(bucket, monkeypatch):
+    """A failed conditional PUT re-reads best.json and re-compares."""
+    ts = '2026-01-01T00:00:00Z'
+    handler.update_best_design('s4', 'NACA4412_a2.0', _results(0.012, 0.5), ts, 0.30)
+
+    put_best = handler._put_best
+
+    def racing_put(best_key, best, etag):
+        # Another container stores a better design just before this write
+        other = dict(_stored_best('s4'), geometry_id='NACA2408_a2.0', Cd=0.009)
+        handler.s3.put_object(Bucket=BUCKET, Key=best_key, Body=handler._dumps_object(other))
+        monkeypatch.setattr(handler, '_put_best', put_best)
+        return False
+
+    monkeypatch.setattr(handler, '_put_best', racing_put)
+
+    best = handler.update_best_design('s4', 'NACA2410_a2.0', _results(0.010, 0.5), ts, 0.30)
+    assert best['geometry_id'] == 'NACA2408_a2.0'
+    assert _stored_best('s4')['geometry_id'] == 'NACA2408_a2.0'
+
+
+def test_save_to_s3_waits_for_and_logs_each_failed_put(bucket, monkeypatch, caplog):
+    put = handler._put
+
+    def failing_put(key, body, content_type):
+        if '/history/' in key or '/iterations/' in key:
+            raise RuntimeError(f"PUT failed: {key.split('/')[2]}")
+        put(key, body, content_type)
+
+    monkeypatch.setattr(handler, '_put', failing_put)
+    results = dict(_results(0.012, 0.5), iterations=200, computation_time=1.0)
+
+    with pytest.raises(RuntimeError):
+        handler.save_to_s3('s5', 'NACA4412_a2.0', results, 1)
+
+    messages = [r.getMessage() for r in caplog.records if r.levelname == 'ERROR']
+    assert sum('PUT failed: history' in m for m in messages) == 1
+    assert sum('PUT failed: iterations' in m for m in messages) == 1
+    # The design PUT finished before save_to_s3 returned
+    handler.s3.head_object(Bucket=BUCKET, Key='sessions/s5/designs/NACA4412_a2.0.json')
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,179 @@
+"""
+Test the S3 session store in lambdas/shared/python/session_manager.py.
+
+S3 is mocked with moto, so no AWS account is needed.
+"""
+
+import os
+import sys
+import time
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError, ParamValidationError
+from moto import mock_aws
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+BUCKET = 'cfd-test-bucket'
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ['S3_BUCKET'] = BUCKET
+
+import session_manager  # noqa: E402
+
+
+@pytest.fixture
+def s3():
+    """Mocked bucket; the cached client is rebuilt inside the mock."""
+    with mock_aws():
+        session_manager.get_s3_client.cache_clear()
+        session_manager.get_session_manager.cache_clear()
+        client = boto3.client('s3')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        session_manager.get_s3_client.cache_clear()
+        session_manager.get_session_manager.cache_clear()
+
+
+def _next_second():
+    """Sleep past the one-second resolution of S3 LastModified."""
+    time.sleep(1.1)
+
+
+def test_list_sessions_returns_most_recently_updated(s3, monkeypatch):
+    for sid in ('a', 'b', 'c'):
+        session_manager.SessionManager(sid).create_session({'max_iter': 5})
+        _next_second()
+    # Other objects under a session must not make it count twice
+    s3.put_object(Bucket=BUCKET, Key='sessions/b/best.json', Body=b'{}')
+    session_manager.SessionManager('a').update_session({'current_iteration': 1})
+
+    client = session_manager.get_s3_client()
+    gets = []
+    get_object = client.get_object
+    monkeypatch.setattr(client, 'get_object', lambda **kw: gets.append(kw['Key']) or get_object(**kw))
+
+    sessions = session_manager.list_sessions(max_sessions=2)
+
+    assert [s['session_id'] for s in sessions] == ['a', 'c']
+    assert sessions[0]['current_iteration'] == 1
+    # One GET per session, nothing else
+    assert sorted(gets) == [f"sessions/{sid}/session.json" for sid in ('a', 'b', 'c')]
+
+
+def test_list_sessions_skips_prefixes_without_session(s3):
+    session_manager.SessionManager('a').create_session({'max_iter': 5})
+    s3.put_object(Bucket=BUCKET, Key='sessions/orphan/best.json', Body=b'{}')
+
+    assert [s['session_id'] for s in session_manager.list_sessions()] == ['a']
+
+
+def test_list_sessions_empty_bucket(s3):
+    assert session_manager.list_sessions() == []
+
+
+def _precondition_failed():
+    return ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': 'stale'}}, 'PutObject')
+
+
+def test_update_session_uses_snapshot_without_get(s3, monkeypatch):
+    manager = session_manager.SessionManager('s1')
+    manager.create_session({'max_iter': 5})
+
+    monkeypatch.setattr(manager.s3_client, 'get_object', pytest.fail)
+    manager.update_session({'current_iteration': 1})
+    manager.update_session({'current_iteration': 2})
+    monkeypatch.undo()
+
+    assert session_manager.SessionManager('s1', s3_client=s3).get_session()['current_iteration'] == 2
+
+
+def test_update_session_retries_after_conflict(s3, monkeypatch):
+    manager = session_manager.SessionManager('s1')
+    manager.create_session({'max_iter': 5})
+
+    # Another container updates the session after this manager's last write
+    session_manager.SessionManager('s1', s3_client=s3).update_session({'total_designs_evaluated': 7})
+
+    put_object = manager.s3_client.put_object
+    get_object = manager.s3_client.get_object
+    puts, gets = [], []
+
+    def conflicting_put(**kwargs):
+        puts.append(kwargs)
+        if len(puts) == 1:
+            raise _precondition_failed()
+        return put_object(**kwargs)
+
+    def counting_get(**kwargs):
+        gets.append(kwargs)
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(manager.s3_client, 'put_object', conflicting_put)
+    monkeypatch.setattr(manager.s3_client, 'get_object', counting_get)
+
+    manager.update_session({'current_iteration': 2})
+
+    assert len(puts) == 2
+    assert len(gets) == 1
+    stored = session_manager.SessionManager('s1', s3_client=s3).get_session()
+    # The retry was applied on top of the other writer's change, not over it
+    assert stored['current_iteration'] == 2
+    assert stored['total_designs_evaluated'] == 7
+
+
+def test_update_session_gives_up_after_second_conflict(s3, monkeypatch):
+    manager = session_manager.SessionManager('s1')
+    manager.create_session({'max_iter': 5})
+
+    def always_conflicts(**kwargs):
+        raise _precondition_failed()
+
+    monkeypatch.setattr(manager.s3_client, 'put_object', always_conflicts)
+
+    with pytest.raises(ClientError):
+        manager.update_session({'current_iteration': 2})
+
+
+def test_put_session_falls_back_when_if_match_is_rejected(s3, monkeypatch):
+    monkeypatch.setattr(session_manager, '_IF_MATCH_SUPPORTED', True)
+    manager = session_manager.SessionManager('s1')
+    manager.create_session({'max_iter': 5})
+
+    put_object = manager.s3_client.put_object
+    puts = []
+
+    def old_botocore_put(**kwargs):
+        puts.append(kwargs)
+        if 'IfMatch' in kwargs:
+            raise ParamValidationError(report='Unknown parameter in input: "IfMatch"')
+        return put_object(**kwargs)
+
+    monkeypatch.setattr(manager.s3_client, 'put_object', old_botocore_put)
+    manager.update_session({'current_iteration': 3})
+
+    assert ['IfMatch' in kwargs for kwargs in puts] == [True, False]
+    assert session_manager._IF_MATCH_SUPPORTED is False
+    assert session_manager.SessionManager('s1', s3_client=s3).get_session()['current_iteration'] == 3
+
+
+def test_put_session_reraises_other_validation_errors(s3, monkeypatch):
+    monkeypatch.setattr(session_manager, '_IF_MATCH_SUPPORTED', True)
+    manager = session_manager.SessionManager('s1')
+    manager.create_session({'max_iter': 5})
+
+    def invalid_put(**kwargs):
+        raise ParamValidationError(report='Invalid type for parameter Body')
+
+    monkeypatch.setattr(manager.s3_client, 'put_object', invalid_put)
+
+    with pytest.raises(ParamValidationError):
+        manager.update_session({'current_iteration': 3})
+    assert session_manager._IF_MATCH_SUPPORTED is True
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
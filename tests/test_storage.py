@@ -0,0 +1,76 @@
+"""
+Test the CSV storage adapter in lambdas/shared/python/storage.py.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+pytest.importorskip('pandas')
+
+from storage import DesignHistoryStorage  # noqa: E402
+
+
+def _design(geometry_id, cd, cl, converged=True):
+    return {
+        'timestamp': '2026-01-01T00:00:00',
+        'geometry_id': geometry_id,
+        'thickness': 0.12,
+        'max_camber': 0.04,
+        'camber_position': 0.4,
+        'alpha': 2.0,
+        'Cl': cl,
+        'Cd': cd,
+        'L_D': round(cl / cd, 2),
+        'converged': converged,
+        'reynolds': 1e6,
+        'iterations': 200,
+        'computation_time': 1.5
+    }
+
+
+def test_get_best_design_returns_full_row(tmp_path):
+    storage = DesignHistoryStorage(str(tmp_path / 'design_history.csv'))
+    storage.write_designs([
+        _design('NACA4412_a2.0', 0.012, 0.5),
+        _design('NACA0008_a0.0', 0.008, 0.1),
+        _design('NACA0010_a2.0', 0.009, 0.5, converged=False),
+        _design('NACA2410_a2.0', 0.010, 0.4),
+    ])
+
+    best = storage.get_best_design(constraint_cl_min=0.30)
+
+    assert best['geometry_id'] == 'NACA2410_a2.0'
+    assert best['Cd'] == 0.010
+    assert best['reynolds'] == 1e6
+    assert best['iterations'] == 200
+    assert best['computation_time'] == 1.5
+
+
+def test_get_best_design_with_blank_lines(tmp_path):
+    """Blank lines are skipped by the parser, so row positions aren't file line numbers."""
+    path = tmp_path / 'design_history.csv'
+    storage = DesignHistoryStorage(str(path))
+    storage.write_design(_design('NACA4412_a2.0', 0.012, 0.5))
+    with open(path, 'a', newline='') as f:
+        f.write('\r\n\r\n')
+    storage.write_design(_design('NACA2412_a2.0', 0.015, 0.5))
+    storage.write_design(_design('NACA2410_a2.0', 0.010, 0.4))
+
+    assert storage.get_best_design(constraint_cl_min=0.30)['geometry_id'] == 'NACA2410_a2.0'
+
+
+def test_get_best_design_without_feasible_designs(tmp_path):
+    storage = DesignHistoryStorage(str(tmp_path / 'design_history.csv'))
+    assert storage.get_best_design() is None
+
+    storage.write_design(_design('NACA0008_a0.0', 0.008, 0.1))
+    assert storage.get_best_design(constraint_cl_min=0.30) is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
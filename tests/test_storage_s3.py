@@ -0,0 +1,155 @@
+"""
+Test the S3 storage adapters in lambdas/shared/python/storage_s3.py.
+
+S3 is mocked with moto, so no AWS account is needed.
+"""
+
+import os
+import sys
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'lambdas', 'shared', 'python'))
+
+BUCKET = 'cfd-test-bucket'
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ['S3_BUCKET'] = BUCKET
+
+import storage_s3  # noqa: E402
+
+
+@pytest.fixture
+def s3():
+    """Mocked bucket; the cached client and parsed objects are reset inside the mock."""
+    with mock_aws():
+        storage_s3.get_s3_client.cache_clear()
+        storage_s3._OBJECT_CACHE.clear()
+        client = boto3.client('s3')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        storage_s3.get_s3_client.cache_clear()
+
+
+def _next_second():
+    """Sleep past the one-second resolution of S3 LastModified."""
+    time.sleep(1.1)
+
+
+def test_compact_history_keeps_key_order(s3):
+    header = "timestamp,geometry_id,Cl,Cd\n"
+    # Written out of order; keys (iteration numbers) decide the row order
+    for part in ('000010', '000002', '000001'):
+        s3.put_object(Bucket=BUCKET, Key=f"sessions/s1/history/part-{part}.csv",
+                      Body=f"{header}t{part},NACA{part[-4:]},0.5,0.01\n")
+
+    key = storage_s3.S3DesignHistoryStorage('s1', s3_client=s3).compact_history()
+
+    assert key == "sessions/s1/design_history.csv"
+    body = s3.get_object(Bucket=BUCKET, Key=key)['Body'].read().decode()
+    assert body == (header
+                    + "t000001,NACA0001,0.5,0.01\n"
+                    + "t000002,NACA0002,0.5,0.01\n"
+                    + "t000010,NACA0010,0.5,0.01\n")
+
+
+def test_compact_history_without_shards(s3):
+    assert storage_s3.S3DesignHistoryStorage('empty', s3_client=s3).compact_history() is None
+
+
+def test_get_latest_designs_ranks_by_last_modified(s3):
+    storage = storage_s3.S3DesignHistoryStorage('s1', s3_client=s3)
+    # Oldest object, even though its timestamp field sorts last
+    storage.write_design({'geometry_id': 'NACA4410_a2.0', 'timestamp': '2026-01-01T00:00:09'})
+    _next_second()
+    storage.write_design({'geometry_id': 'NACA4412_a2.0', 'timestamp': '2026-01-01T00:00:01'})
+    _next_second()
+    storage.write_design({'geometry_id': 'NACA4414_a2.0', 'timestamp': '2026-01-01T00:00:02'})
+
+    latest = storage.get_latest_designs(n=2)
+
+    # The two newest objects, most recent timestamp first
+    assert [d['geometry_id'] for d in latest] == ['NACA4414_a2.0', 'NACA4412_a2.0']
+    assert len(storage.get_latest_designs(n=10)) == 3
+
+
+def test_read_all_designs_concurrent_matches_serial(s3):
+    storage = storage_s3.S3DesignHistoryStorage('s1', s3_client=s3)
+    for i in range(20):
+        s3.put_object(Bucket=BUCKET, Key=f"{storage.prefix}d{i:02d}.json",
+                      Body=storage_s3._dumps_object({'geometry_id': f"d{i:02d}"}))
+    # Unreadable objects are skipped, not fatal
+    s3.put_object(Bucket=BUCKET, Key=f"{storage.prefix}d05x.json", Body=b'not json')
+
+    concurrent = storage.read_all_designs(concurrency=8)
+    serial = storage.read_all_designs(concurrency=1)
+
+    assert [d['geometry_id'] for d in concurrent] == [f"d{i:02d}" for i in range(20)]
+    assert concurrent == serial
+
+
+def test_read_all_results_sorted_by_iteration(s3):
+    storage = storage_s3.S3ResultsStorage('s1', s3_client=s3)
+    for iteration in (3, 1, 12, 2):
+        storage.write_result({'iteration': iteration, 'best_cd': 0.02 - iteration / 1000})
+
+    results = storage.read_all_results(concurrency=4)
+
+    assert [r['iteration'] for r in results] == [1, 2, 3, 12]
+    assert storage.get_latest_iteration()['iteration'] == 12
+
+
+def test_write_designs_writes_one_object_each(s3):
+    storage = storage_s3.S3DesignHistoryStorage('s1', s3_client=s3)
+    designs = [{'geometry_id': f"NACA44{10 + i}_a2.0", 'timestamp': f"2026-01-01T00:00:{i:02d}"}
+               for i in range(10)]
+
+    storage.write_designs(designs, concurrency=4)
+
+    read = storage.read_all_designs()
+    assert sorted(d['geometry_id'] for d in read) == sorted(d['geometry_id'] for d in designs)
+
+
+def test_write_designs_raises_after_all_writes(s3, monkeypatch):
+    storage = storage_s3.S3DesignHistoryStorage('s1', s3_client=s3)
+    write_design = storage.write_design
+
+    def failing_write(data):
+        if data['geometry_id'] == 'bad':
+            raise RuntimeError('PUT failed')
+        write_design(data)
+
+    monkeypatch.setattr(storage, 'write_design', failing_write)
+    designs = [{'geometry_id': gid, 'timestamp': '2026-01-01T00:00:00'} for gid in ('a', 'bad', 'c', 'd')]
+
+    with pytest.raises(RuntimeError):
+        storage.write_designs(designs, concurrency=4)
+
+    # The other writes still completed
+    assert sorted(d['geometry_id'] for d in storage.read_all_designs()) == ['a', 'c', 'd']
+
+
+def test_read_first_and_last_results_orders_numerically(s3):
+    storage = storage_s3.S3ResultsStorage('s1', s3_client=s3)
+    # iteration_1000 sorts before iteration_999 as a string
+    for iteration in (998, 1000, 999, 1):
+        storage.write_result({'iteration': iteration, 'best_cd': 0.02})
+
+    count, first, last = storage.read_first_and_last_results()
+
+    assert count == 4
+    assert first['iteration'] == 1
+    assert last['iteration'] == 1000
+
+
+def test_read_first_and_last_results_empty(s3):
+    assert storage_s3.S3ResultsStorage('s1', s3_client=s3).read_first_and_last_results() == (0, None, None)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))